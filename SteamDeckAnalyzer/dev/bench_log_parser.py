@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+
+# Micro-benchmark of the Steam log line parser on a synthetic log, e.g.:
+#   python bench_log_parser.py --lines 10000000
+#   java -jar jython-standalone-2.7.3.jar bench_log_parser.py --lines 10000000
+
+import os
+import re
+import sys
+import time
+import itertools
+import argparse
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.steamlog import SteamLogParser
+
+
+MESSAGES = [
+    "Loaded 1 input devices",
+    "Connection to 155.133.248.38:27018 established",
+    "Controller 0 (Steam Deck) connected, configuring...",
+    "HTTP (SingleDownload) content request for depot 228990 chunk 8f0a1c timed out",
+    "CClientNetworkingAPI::ReleaseSession: Session 9 released",
+    "  (indented) shader cache ready",
+]
+
+
+def generate_lines(count):
+    # stream a repeating block of lines with timestamps, continuation lines, and empty lines
+    block = []
+    for i in range(10000):
+        if i % 50 == 49:
+            block.append("\n")
+        elif i % 10 == 9:
+            block.append("    at continuation line {}\n".format(i))
+        else:
+            block.append("[2023-{:02d}-{:02d} {:02d}:{:02d}:{:02d}] {}\n".format(
+                1 + i // 2678400 % 12, 1 + i // 86400 % 28,
+                i // 3600 % 24, i // 60 % 60, i % 60, MESSAGES[i % len(MESSAGES)]))
+    return itertools.islice(itertools.cycle(block), count)
+
+
+def parse_legacy(lines, enable_prev_ts):
+    # previous implementation, with uncompiled patterns
+    pattern = r"^\[(\d{4}-\d{2}-\d{2}\s+\d{2}:\d{2}:\d{2})\]\s+(.*)$"
+    pattern_ts = r"^\[(\d{4}-\d{2}-\d{2}\s+\d{2}:\d{2}:\d{2})\]"
+    prev_ts = None
+    rel_index = 0
+
+    for line in lines:
+        l = line.strip()
+        if not l:
+            continue
+
+        if not enable_prev_ts:
+            m = re.match(pattern, l)
+            if m:
+                yield (m.groups()[0].strip(), "path", rel_index, m.groups()[1].strip())
+                rel_index += 1
+
+        else:
+            m = re.search(pattern_ts, l)
+            if m:
+                prev_ts = m.groups()[0].strip()
+                m = re.match(pattern, l)
+                if m:
+                    yield (m.groups()[0].strip(), "path", rel_index, m.groups()[1].strip())
+                    rel_index += 1
+            else:
+                yield (prev_ts, "path", rel_index, l)
+                rel_index += 1
+
+
+def parse_fast(lines, enable_prev_ts):
+    return SteamLogParser("path", continued=enable_prev_ts).parse(lines)
+
+
+def run(name, parse, count, enable_prev_ts):
+    entries = 0
+    start = time.time()
+    for _ in parse(generate_lines(count), enable_prev_ts):
+        entries += 1
+    elapsed = time.time() - start
+    print("{:<8} continued={:<5} {:>10} lines {:>10} entries {:>8.2f} s {:>12.0f} lines/s".format(
+        name, str(enable_prev_ts), count, entries, elapsed, count / max(elapsed, 1e-9)))
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Steam log line parsers.")
+    parser.add_argument("--lines", type=int, default=10000000, help="number of synthetic lines")
+    parser.add_argument("--skip-legacy", action="store_true", help="only run the new parser")
+    args = parser.parse_args()
+
+    # make sure both parsers agree before timing them
+    sample = list(generate_lines(10000))
+    for enable_prev_ts in [False, True]:
+        assert list(parse_legacy(sample, enable_prev_ts)) == list(parse_fast(sample, enable_prev_ts))
+
+    # measure the time to generate lines, which is included in all results
+    start = time.time()
+    for _ in generate_lines(args.lines):
+        pass
+    print("{:<8} {:>27} lines {:>19.2f} s".format("generate", args.lines, time.time() - start))
+
+    for enable_prev_ts in [False, True]:
+        elapsed_fast = run("fast", parse_fast, args.lines, enable_prev_ts)
+        if not args.skip_legacy:
+            elapsed_legacy = run("legacy", parse_legacy, args.lines, enable_prev_ts)
+            print("speedup  {:.2f}x".format(elapsed_legacy / max(elapsed_fast, 1e-9)))
+
+
+if __name__ == "__main__":
+    main()
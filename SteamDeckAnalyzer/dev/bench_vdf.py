@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+
+# Micro-benchmark of the text VDF parsers (and the extraction of key paths)
+# on a synthetic `localconfig.vdf`, e.g.:
+#   python bench_vdf.py --apps 5000 --friends 5000
+#   java -jar jython-standalone-2.7.3.jar bench_vdf.py --apps 5000 --friends 5000
+
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.thirdparty import vdf
+from utils.thirdparty.vdfutils.vdfutils import parse_vdf as vdfutils_parse_vdf
+from utils.vdf_reader import VDFReader
+
+
+# key paths extracted by the modules
+PATHS_FRIENDS = [("UserLocalConfigStore", "friends")]
+PATHS_APPS = [
+    ("UserLocalConfigStore", "Software", "Valve", "Steam", "apps"),
+    ("UserLocalConfigStore", "Software", "Valve", "Steam", "LastPlayedTimesSyncTime"),
+]
+
+
+def generate_localconfig(apps, friends, seed=0):
+    # localconfig.vdf with apps, friends and their name histories
+    r = random.Random(seed)
+    lines = ['"UserLocalConfigStore"', "{", '\t"friends"', "\t{"]
+    for i in range(friends):
+        lines.extend([
+            '\t\t"{}"'.format(10000000 + i), "\t\t{",
+            '\t\t\t"name"\t\t"friend \\"{}\\""'.format(i),
+            '\t\t\t"avatar"\t\t"{:040x}"'.format(r.getrandbits(160)),
+            '\t\t\t"NameHistory"', "\t\t\t{",
+        ])
+        for k in range(r.randint(0, 5)):
+            lines.append('\t\t\t\t"{}"\t\t"old name {}\\\\{}"'.format(k, i, k))
+        lines.extend(["\t\t\t}", "\t\t}"])
+    lines.extend(["\t}", '\t"Software"', "\t{", '\t\t"Valve"', "\t\t{", '\t\t\t"Steam"', "\t\t\t{",
+                  '\t\t\t\t"apps"', "\t\t\t\t{"])
+    for i in range(apps):
+        lines.extend([
+            '\t\t\t\t\t"{}"'.format(r.randint(10, 2000000)), "\t\t\t\t\t{",
+            '\t\t\t\t\t\t"LastPlayed"\t\t"{}"'.format(r.randint(1500000000, 1700000000)),
+            '\t\t\t\t\t\t"Playtime"\t\t"{}"'.format(r.randint(0, 100000)),
+            '\t\t\t\t\t\t"cloud"', "\t\t\t\t\t\t{",
+            '\t\t\t\t\t\t\t"last_sync_state"\t\t"synchronized"',
+            "\t\t\t\t\t\t}",
+            "\t\t\t\t\t}",
+        ])
+    lines.extend(["\t\t\t\t}", '\t\t\t\t"LastPlayedTimesSyncTime"\t\t"1700000000"',
+                  "\t\t\t}", "\t\t}", "\t}", "}"])
+    return "\n".join(lines) + "\n"
+
+
+def run(name, parse, text, repeat):
+    start = time.time()
+    for _ in range(repeat):
+        parse(text)
+    elapsed = (time.time() - start) / repeat
+    print("{:<10} {:>10} bytes {:>8.3f} s {:>10.2f} MB/s".format(
+        name, len(text), elapsed, len(text) / 1048576.0 / max(elapsed, 1e-9)))
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark text VDF parsers.")
+    parser.add_argument("--apps", type=int, default=5000, help="number of apps")
+    parser.add_argument("--friends", type=int, default=5000, help="number of friends")
+    parser.add_argument("--repeat", type=int, default=3, help="number of runs per parser")
+    args = parser.parse_args()
+
+    text = generate_localconfig(args.apps, args.friends)
+
+    # make sure the new parser is a drop-in for vdfutils before timing it
+    data = vdfutils_parse_vdf(text)
+    assert VDFReader.parse(text) == data
+    for paths in [PATHS_FRIENDS, PATHS_APPS]:
+        assert VDFReader.extract(text, paths) == VDFReader.select(data, paths)
+
+    elapsed_reader = run("VDFReader", VDFReader.parse, text, args.repeat)
+    elapsed_vdfutils = run("vdfutils", vdfutils_parse_vdf, text, args.repeat)
+    elapsed_vdf = run("vdf", vdf.loads, text, args.repeat)
+    print("speedup  {:.2f}x (vdfutils), {:.2f}x (vdf)".format(
+        elapsed_vdfutils / max(elapsed_reader, 1e-9), elapsed_vdf / max(elapsed_reader, 1e-9)))
+
+    # extract only what the modules need
+    for name, paths in [("friends", PATHS_FRIENDS), ("apps", PATHS_APPS)]:
+        elapsed = run(name, lambda t: VDFReader.extract(t, paths), text, args.repeat)
+        print("speedup  {:.2f}x (VDFReader)".format(elapsed_reader / max(elapsed, 1e-9)))
+
+
+if __name__ == "__main__":
+    main()
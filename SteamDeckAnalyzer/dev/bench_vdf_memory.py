@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+
+# Memory benchmark of parsed VDF trees (`OrderedDict`, `VDFDict`, and `VDFNode`)
+# on a synthetic `localconfig.vdf`, e.g.:
+#   python bench_vdf_memory.py --apps 5000 --friends 5000
+#   java -jar jython-standalone-2.7.3.jar bench_vdf_memory.py --apps 5000 --friends 5000
+
+import os
+import gc
+import sys
+import time
+import argparse
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.thirdparty import vdf
+from utils.thirdparty.vdf.vdict import VDFDict
+from utils.vdf_reader import VDFReader
+from utils.vdf_tree import VDFNode
+from bench_vdf import generate_localconfig
+
+
+def used_memory():
+    # heap in use after garbage collection (Jython only)
+    from java.lang import Runtime
+    runtime = Runtime.getRuntime()
+    for _ in range(3):
+        gc.collect()
+        time.sleep(0.1)
+    return runtime.totalMemory() - runtime.freeMemory()
+
+
+def deep_size(obj, seen=None):
+    # bytes of an object and everything it references, each object counted once (CPython only)
+    seen = set() if seen is None else seen
+    size = 0
+    stack = [obj]
+    while stack:
+        o = stack.pop()
+        if id(o) in seen:
+            continue
+        seen.add(id(o))
+        size += sys.getsizeof(o)
+        if isinstance(o, dict):
+            stack.extend(o.keys())
+            stack.extend(o.values())
+        elif isinstance(o, (list, tuple, set, frozenset)):
+            stack.extend(o)
+        if hasattr(o, "__dict__"):
+            stack.append(o.__dict__)
+        for slot in getattr(type(o), "__slots__", ()):
+            if hasattr(o, slot):
+                stack.append(getattr(o, slot))
+    return size
+
+
+def measure(name, build, text):
+    if sys.platform.startswith("java"):
+        before = used_memory()
+        tree = build(text)
+        size = used_memory() - before
+    else:
+        tree = build(text)
+        size = deep_size(tree)
+    print("{:<12} {:>10} bytes of text {:>14} bytes in memory {:>8.1f}x".format(
+        name, len(text), size, size / float(max(len(text), 1))))
+    return tree, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the memory of parsed VDF trees.")
+    parser.add_argument("--apps", type=int, default=5000, help="number of apps")
+    parser.add_argument("--friends", type=int, default=5000, help="number of friends")
+    args = parser.parse_args()
+
+    text = generate_localconfig(args.apps, args.friends)
+
+    # make sure all trees hold the same document before measuring them
+    data = VDFReader.parse(text)
+    assert VDFNode.from_dict(data) == data
+    assert VDFNode.from_dict(data).to_dict() == data
+    del data
+
+    _, size_ordered = measure("OrderedDict", VDFReader.parse, text)
+    _, size_vdfdict = measure("VDFDict", lambda t: vdf.loads(t, mapper=VDFDict), text)
+    _, size_node = measure("VDFNode", lambda t: VDFNode.from_dict(VDFReader.parse(t)), text)
+    print("saving   {:.2f}x (OrderedDict), {:.2f}x (VDFDict)".format(
+        size_ordered / float(max(size_node, 1)), size_vdfdict / float(max(size_node, 1))))
+
+
+if __name__ == "__main__":
+    main()
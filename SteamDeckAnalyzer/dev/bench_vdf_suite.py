@@ -0,0 +1,396 @@
+# -*- coding: utf-8 -*-
+
+# Benchmark suite of the VDF parsers on Steam-shaped documents of growing size, reporting
+# throughput, peak memory, and retained objects as JSON (and comparing them to a baseline), e.g.:
+#   python bench_vdf_suite.py --sizes 1K,100K,10M --output results.json
+#   python bench_vdf_suite.py --baseline results.json --tolerance 0.25
+#   java -jar jython-standalone-2.7.3.jar bench_vdf_suite.py --sizes 1K,1M,50M
+
+import os
+import gc
+import re
+import sys
+import json
+import time
+import random
+import tempfile
+import argparse
+import platform
+import subprocess
+from collections import OrderedDict
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.thirdparty import vdf
+from utils.thirdparty.vdf.vdict import VDFDict
+from utils.thirdparty.vdfutils.vdfutils import parse_vdf as vdfutils_parse_vdf
+from utils.vdf_reader import VDFReader
+from utils.vdf_binary import BinaryVDFReader
+from utils.vdf_tree import VDFNode
+from bench_vdf import generate_localconfig, PATHS_FRIENDS
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+SIZES = "1K,10K,100K,1M,10M,50M"
+UNITS = {"": 1, "K": 1024, "M": 1024 * 1024}
+
+# documents of at least this size are parsed once per parser
+SIZE_SINGLE_RUN = 10 * 1024 * 1024
+
+# documents of at most this size are checked against the reference parser before timing
+SIZE_VERIFY = 1024 * 1024
+
+
+def format_text(data, depth=0):
+    # Steam's own layout of text VDF: tab-indented, with quoted keys and values
+    lines = []
+    indent = "\t" * depth
+    for key, value in data.items():
+        key = escape(key)
+        if isinstance(value, dict):
+            lines.append('{}"{}"'.format(indent, key))
+            lines.append("{}{{".format(indent))
+            lines.append(format_text(value, depth + 1))
+            lines.append("{}}}".format(indent))
+        else:
+            lines.append('{}"{}"\t\t"{}"'.format(indent, key, escape(str(value))))
+    return "\n".join(line for line in lines if line)
+
+
+def escape(s):
+    return s.replace("\\", "\\\\").replace('"', '\\"')
+
+
+def generate_registry(n, seed=0):
+    # registry.vdf with n apps
+    r = random.Random(seed)
+    apps = OrderedDict()
+    for i in range(n):
+        apps[str(r.randint(10, 2000000))] = OrderedDict([
+            ("name", "App {}".format(i)),
+            ("Installed", str(r.randint(0, 1))),
+            ("Running", "0"),
+            ("Updating", str(r.randint(0, 1))),
+        ])
+    steam = OrderedDict([
+        ("AutoLoginUser", "deckuser"),
+        ("RunningAppID", "0"),
+        ("apps", apps),
+        ("language", "english"),
+    ])
+    return format_text(OrderedDict([("Registry", OrderedDict([("HKCU", OrderedDict([
+        ("Software", OrderedDict([("Valve", OrderedDict([("Steam", steam)]))]))]))]))])) + "\n"
+
+
+def generate_libraryfolders(n, seed=0):
+    # libraryfolders.vdf with n apps spread across an internal drive and an SD card
+    r = random.Random(seed)
+    folders = OrderedDict()
+    for i, path in enumerate(["/home/deck/.local/share/Steam", "/run/media/mmcblk0p1"]):
+        apps = OrderedDict()
+        for _ in range(n // 2 + (n % 2 if i == 0 else 0)):
+            apps[str(r.randint(10, 2000000))] = str(r.randint(0, 100000000000))
+        folders[str(i)] = OrderedDict([
+            ("path", path),
+            ("label", ""),
+            ("contentid", str(r.getrandbits(63))),
+            ("totalsize", str(r.randint(0, 1000000000000))),
+            ("update_clean_bytes_tally", str(r.randint(0, 100000000))),
+            ("time_last_update_corruption", "0"),
+            ("apps", apps),
+        ])
+    return format_text(OrderedDict([("libraryfolders", folders)])) + "\n"
+
+
+def generate_appmanifest(n, seed=0):
+    # appmanifest_<ID>.acf with n installed (and shared) depots
+    r = random.Random(seed)
+    depots = OrderedDict()
+    for _ in range(n):
+        depots[str(r.randint(10, 2000000))] = OrderedDict([
+            ("manifest", str(r.getrandbits(63))),
+            ("size", str(r.randint(0, 100000000000))),
+        ])
+    return format_text(OrderedDict([("AppState", OrderedDict([
+        ("appid", "1091500"),
+        ("Universe", "1"),
+        ("LauncherPath", "C:\\Program Files (x86)\\Steam\\steam.exe"),
+        ("name", "Cyberpunk 2077"),
+        ("StateFlags", "4"),
+        ("installdir", "Cyberpunk 2077"),
+        ("LastUpdated", "1700000000"),
+        ("SizeOnDisk", str(r.randint(0, 100000000000))),
+        ("buildid", "12345678"),
+        ("LastOwner", "76561198000000000"),
+        ("InstalledDepots", depots),
+        ("UserConfig", OrderedDict([("language", "english")])),
+        ("MountedConfig", OrderedDict([("language", "english")])),
+    ]))])) + "\n"
+
+
+def generate_reservations(n, seed=0):
+    # the reservation documents of vdfutils' stresstest.py, with n entries
+    r = random.Random(seed)
+    chars = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    nums = "0123456789"
+    reservations = OrderedDict()
+    for i in range(n):
+        reservations["XVIS-{}".format(i)] = OrderedDict([
+            ("reserved", str(r.randint(0, 1))),
+            ("user", "".join(r.sample(chars, r.randrange(0, 10)))),
+            ("clean", str(r.randint(0, 1))),
+            ("startTime", "".join(r.sample(nums, r.randrange(0, 10)))),
+            ("endTime", "".join(r.sample(nums, r.randrange(0, 10)))),
+            ("password", OrderedDict([
+                ("salt", "".join(r.sample(chars, r.randrange(0, 10)))),
+                ("hash", "".join(r.sample(chars, r.randrange(0, 10)))),
+            ])),
+        ])
+    return format_text(OrderedDict([("reservations", reservations)])) + "\n"
+
+
+# document kinds, each generated from a number of entries
+GENERATORS = OrderedDict([
+    ("localconfig", lambda n: generate_localconfig(n, n)),
+    ("registry", generate_registry),
+    ("libraryfolders", generate_libraryfolders),
+    ("appmanifest", generate_appmanifest),
+    ("reservations", generate_reservations),
+])
+
+# (name, format, parse, comparable to the reference parser of its format)
+PARSERS = [
+    ("VDFReader", "text", VDFReader.parse, True),
+    ("VDFReader.extract", "text", lambda t: VDFReader.extract(t, PATHS_FRIENDS), False),
+    ("VDFNode", "text", lambda t: VDFNode.from_dict(VDFReader.parse(t)), True),
+    ("vdfutils", "text", vdfutils_parse_vdf, True),
+    ("vdf", "text", lambda t: vdf.loads(t, mapper=OrderedDict), True),
+    ("vdf (VDFDict)", "text", lambda t: vdf.loads(t, mapper=VDFDict), False),
+    ("BinaryVDFReader", "binary", lambda b: BinaryVDFReader.loads(b)[0], True),
+    ("BinaryVDFReader.skip", "binary", BinaryVDFReader.skip, False),
+    ("vdf.binary_loads", "binary", lambda b: vdf.binary_loads(b, mapper=OrderedDict), True),
+]
+
+# parsers only run for some document kinds
+PARSER_KINDS = {
+    "VDFReader.extract": ["localconfig"],
+}
+
+
+def parse_size(s):
+    m = re.match(r"^(\d+)([KM]?)B?$", s.strip().upper())
+    if not m:
+        raise argparse.ArgumentTypeError("invalid size: {}".format(s))
+    return int(m.group(1)) * UNITS[m.group(2)]
+
+
+def generate(kind, size):
+    # scale the number of entries from a sample, so that the document has about the given size
+    generator = GENERATORS[kind]
+    sample = 50
+    n = max(1, int(size * sample / float(len(generator(sample)))))
+    return generator(n)
+
+
+def measure_time(parse, data, repeat):
+    # best of several runs
+    best = None
+    for _ in range(repeat):
+        start = time.time()
+        parse(data)
+        elapsed = time.time() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def measure_memory(name, parse, data):
+    # peak bytes while parsing, bytes allocated (Jython only), and objects kept by the result
+    # (CPython only)
+    gc.collect()
+    if sys.platform.startswith("java"):
+        from java.lang import Thread
+        from java.lang.management import ManagementFactory, MemoryType
+        pools = [p for p in ManagementFactory.getMemoryPoolMXBeans() if p.getType() == MemoryType.HEAP]
+        threads = ManagementFactory.getThreadMXBean()
+        thread_id = Thread.currentThread().getId()
+        for pool in pools:
+            pool.resetPeakUsage()
+        used = sum(p.getUsage().getUsed() for p in pools)
+        allocated = threads.getThreadAllocatedBytes(thread_id)
+        parse(data)
+        allocated = threads.getThreadAllocatedBytes(thread_id) - allocated
+        peak = sum(p.getPeakUsage().getUsed() for p in pools) - used
+        return peak, allocated, None
+
+    return measure_peak(name, data), None, count_objects(parse, data)
+
+
+def measure_peak(name, data):
+    # parse in a fresh process, whose growth of the maximum resident set is the peak while
+    # parsing (CPython only, not on Windows)
+    if resource is None:
+        return None
+    fd, path = tempfile.mkstemp(suffix=".vdf")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        output = subprocess.check_output([sys.executable, os.path.abspath(__file__), "--peak-of", name, path])
+        return int(output.split()[-1])
+    finally:
+        os.remove(path)
+
+
+def peak_of(name, path):
+    # run by `measure_peak` in the child process
+    parse = dict((p[0], p[2]) for p in PARSERS)[name]
+    with open(path, "rb") as f:
+        data = f.read()
+    gc.collect()
+    before = max_rss()
+    parse(data)
+    return max_rss() - before
+
+
+def max_rss():
+    # maximum resident set in bytes; on Linux, ru_maxrss of a child starts at the size of the
+    # parent it was forked from, so the high-water mark of the process' own memory is read instead
+    try:
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except IOError:
+        pass
+    # ru_maxrss is in KB, except on macOS
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+
+
+def count_objects(parse, data):
+    # containers tracked by the garbage collector that the result keeps alive
+    gc.collect()
+    before = len(gc.get_objects())
+    result = parse(data)
+    gc.collect()
+    return len(gc.get_objects()) - before
+
+
+def run(kind, size, text, binary, parsers, repeat):
+    results = []
+    reference = {}
+    for name, fmt, parse, comparable in parsers:
+        if kind not in PARSER_KINDS.get(name, [kind]):
+            continue
+        data = text if fmt == "text" else binary
+
+        if comparable and len(data) <= SIZE_VERIFY:
+            parsed = parse(data)
+            if fmt not in reference:
+                reference[fmt] = parsed
+            assert parsed == reference[fmt], "{} differs on {}".format(name, kind)
+            del parsed
+
+        runs = 1 if len(data) >= SIZE_SINGLE_RUN else repeat
+        elapsed = measure_time(parse, data, runs)
+        peak, allocated, gc_objects = measure_memory(name, parse, data)
+
+        result = OrderedDict([
+            ("kind", kind),
+            ("size", size),
+            ("bytes", len(data)),
+            ("format", fmt),
+            ("parser", name),
+            ("runs", runs),
+            ("seconds", elapsed),
+            ("mb_per_s", len(data) / 1048576.0 / max(elapsed, 1e-9)),
+            ("peak_bytes", peak),
+            ("allocated_bytes", allocated),
+            ("gc_objects", gc_objects),
+        ])
+        results.append(result)
+        print("{:<14} {:>10} bytes {:<6} {:<20} {:>8.3f} s {:>8.2f} MB/s {:>12} peak {:>10} gc objects".format(
+            kind, len(data), fmt, name, elapsed, result["mb_per_s"],
+            peak if peak is not None else "-", gc_objects if gc_objects is not None else "-"))
+        sys.stdout.flush()
+    return results
+
+
+def compare(results, baseline, tolerance):
+    # return regressions of throughput and peak memory beyond the tolerance
+    def key(result):
+        return (result["kind"], result["size"], result["parser"])
+
+    regressions = []
+    previous = dict((key(result), result) for result in baseline["results"])
+    for result in results:
+        old = previous.get(key(result))
+        if not old:
+            continue
+        if result["mb_per_s"] < old["mb_per_s"] * (1 - tolerance):
+            regressions.append("{} {} {}: {:.2f} MB/s (was {:.2f} MB/s)".format(
+                key(result)[0], key(result)[1], key(result)[2], result["mb_per_s"], old["mb_per_s"]))
+        if result["peak_bytes"] and old["peak_bytes"] \
+                and result["peak_bytes"] > old["peak_bytes"] * (1 + tolerance):
+            regressions.append("{} {} {}: {} peak bytes (was {})".format(
+                key(result)[0], key(result)[1], key(result)[2], result["peak_bytes"], old["peak_bytes"]))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark VDF parsers on Steam-shaped documents.")
+    parser.add_argument("--sizes", default=SIZES, help="document sizes, e.g., 1K,10M (default: %(default)s)")
+    parser.add_argument("--kinds", default=",".join(GENERATORS.keys()), help="document kinds (default: %(default)s)")
+    parser.add_argument("--parsers", default=None, help="parsers to run (default: all)")
+    parser.add_argument("--repeat", type=int, default=3, help="number of runs per parser (best is reported)")
+    parser.add_argument("--output", default="bench_vdf_suite.json", help="JSON file of results")
+    parser.add_argument("--baseline", default=None, help="JSON file of previous results to compare to")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="relative change reported as regression")
+    parser.add_argument("--peak-of", nargs=2, metavar=("PARSER", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.peak_of:
+        print(peak_of(*args.peak_of))
+        return
+
+    sizes = [(s.strip().upper(), parse_size(s)) for s in args.sizes.split(",") if s.strip()]
+    kinds = [k.strip() for k in args.kinds.split(",") if k.strip()]
+    for kind in kinds:
+        if kind not in GENERATORS:
+            parser.error("unknown kind: {}".format(kind))
+    parsers = PARSERS
+    if args.parsers:
+        names = [p.strip() for p in args.parsers.split(",")]
+        parsers = [p for p in PARSERS if p[0] in names]
+
+    results = []
+    for kind in kinds:
+        for size_name, size in sizes:
+            text = generate(kind, size)
+            binary = vdf.binary_dumps(VDFReader.parse(text))
+            results.extend(run(kind, size_name, text, binary, parsers, args.repeat))
+            del text, binary
+
+    report = OrderedDict([
+        ("python", sys.version.split()[0]),
+        ("implementation", platform.python_implementation()),
+        ("platform", sys.platform),
+        ("time", time.strftime("%Y-%m-%d %H:%M:%S")),
+        ("results", results),
+    ])
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print("results written to {}".format(args.output))
+
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print("regression: {}".format(regression))
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+
+# Build the memory-mapped AppID-to-name index of the Games and Apps module from an app dictionary
+# (as downloaded by the module), e.g.:
+#   python build_app_index.py ..\assets\apps_default.json
+
+import os
+import sys
+import json
+import time
+import argparse
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.appindex import AppNameIndex
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the AppID-to-name index from an app dictionary.")
+    parser.add_argument("path_json", help="app dictionary, i.e., {<APP_ID>: <APP_NAME>, ...} as JSON")
+    parser.add_argument("path_index", nargs="?", default=None,
+                        help="index to write (default: the one the module opens, named after the dictionary's content)")
+    args = parser.parse_args()
+
+    start = time.time()
+    path_index = AppNameIndex.build(args.path_json, args.path_index)
+    index = AppNameIndex(path_index)
+    print("{} apps in {} ({} bytes) after {:.2f} s".format(
+        len(index), path_index, os.path.getsize(path_index), time.time() - start))
+
+    # make sure every app can be looked up again
+    with open(args.path_json, "r") as f:
+        apps = json.load(f)
+    for app_id, name in apps.items():
+        if app_id.isdigit() and int(app_id) <= 0xffffffff:
+            assert index[app_id] == (name or u""), "{}: {!r} vs. {!r}".format(app_id, index[app_id], name)
+    index.close()
+
+
+if __name__ == "__main__":
+    main()
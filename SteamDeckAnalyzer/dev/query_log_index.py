@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+
+# Look up log entries in the index the Log Entries module writes to the case directory
+# (<CASE>\ModuleOutput\SteamDeckAnalyzer\log_entries.db), without Autopsy, e.g.:
+#   python query_log_index.py log_entries.db --from "2023-01-01 21:00" --to "2023-01-01 21:15"
+#   python query_log_index.py log_entries.db --search "192.168.0.12 disconnected"
+
+import os
+import sys
+import argparse
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.logindex import LogEntryIndex
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Look up log entries in the index of a case.")
+    parser.add_argument("path_index", help="index of log entries, i.e., log_entries.db")
+    parser.add_argument("--from", dest="start", default=None,
+                        help="first timestamp, i.e., YYYY-MM-DD [HH:MM:SS] or a prefix of it")
+    parser.add_argument("--to", dest="end", default=None,
+                        help="last timestamp (a prefix includes all timestamps it covers)")
+    parser.add_argument("--search", default=None,
+                        help="words, numbers, or IP addresses that all entries contain (ignores --from and --to)")
+    parser.add_argument("--path", action="append", default=None,
+                        help="only entries of the log file with this path, as shown by Autopsy (repeatable)")
+    parser.add_argument("--limit", type=int, default=1000, help="maximum number of entries (0: no limit)")
+    args = parser.parse_args()
+
+    index = LogEntryIndex(args.path_index).open()
+    try:
+        if args.search:
+            entries = [e for e in index.get_entries(index.search(args.search))
+                       if not args.path or e[1] in args.path]
+            entries = entries[:args.limit] if args.limit else entries
+        else:
+            entries = index.query(args.start, args.end, paths=args.path, limit=args.limit)
+    finally:
+        index.close()
+
+    for ts, path, entry_no, msg in entries:
+        print(u"[{}] {} #{}: {}".format(ts or "", path, entry_no, msg).encode("utf-8"))
+
+
+if __name__ == "__main__":
+    main()
@@ -48,11 +48,26 @@ class SteamDeckDeviceDSIM(DataSourceIngestModulePlus):
             ]
         )
 
+        # (file name, parent path substring) of relevant files
+        self.file_targets = [
+            ("%linux%", "/lib/pacman/local/"),
+            ("steamcl-version", None),
+            ("NetworkManager.state", None),
+            ("lsb-release", None),
+            (".devkit-service-on-os-update", None),
+            ("ktimezonedrc", None),
+            ("internal-%.lease", None),
+            ("user-dirs.locale", None),
+            ("machine-id", "/lib/overlays/etc/upper/"),
+            ("last_auto_attempt", "-biosupdate/"),
+            ("steam_client_steamdeck_stable_ubuntu12.manifest", None),
+        ]
+
     def process(self, dataSource, progressBar):
         DataSourceIngestModulePlus.process(self, dataSource, progressBar)
 
         # determine how much work there will be by pre-filtering files/directories
-        self.files = self.fileManager.findFiles(dataSource, "%")
+        self.files = self.find_files(dataSource)
         
         # update the progress bar
         self.update_progress()
@@ -126,7 +141,7 @@ class SteamDeckDeviceDSIM(DataSourceIngestModulePlus):
             if fname in ["lsb-release", ".devkit-service-on-os-update"]:
                 try:
                     fh = TSKFileUtils.open_file(file)
-                    for line in fh.readlines():
+                    for line in fh:
                         l = line.strip()
                         if not l:
                             continue
@@ -158,7 +173,7 @@ class SteamDeckDeviceDSIM(DataSourceIngestModulePlus):
             if fname.startswith("internal-") and fname.endswith(".lease"):
                 try:
                     fh = TSKFileUtils.open_file(file)
-                    for line in fh.readlines():
+                    for line in fh:
                         l = line.strip()
                         if not l or l.startswith('#'):
                             continue
@@ -8,7 +8,6 @@ from org.sleuthkit.autopsy.ingest import IngestModuleFactoryAdapter
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from utils.autopsyplus import DataSourceIngestModulePlus
 from utils.artifact import ArtifactUtils
-from utils.tsk_file import TSKFileUtils
 from utils.module import VERSION, MODULE_FACTORY_RESET
 
 
@@ -49,11 +48,14 @@ class SteamDeckFactoryResetDSIM(DataSourceIngestModulePlus):
             ]
         )
 
+        # (file name, parent path substring) of relevant files/directories
+        self.file_targets = [("%factory-res%", None)]
+
     def process(self, dataSource, progressBar):
         DataSourceIngestModulePlus.process(self, dataSource, progressBar)
 
         # determine how much work there will be by pre-filtering files/directories
-        self.files = self.fileManager.findFiles(dataSource, "%factory-res%")
+        self.files = self.find_files(dataSource)
         
         # update the progress bar
         self.update_progress()
@@ -72,7 +74,7 @@ class SteamDeckFactoryResetDSIM(DataSourceIngestModulePlus):
 
             if not skip:
                 found = True
-                fileinfo = TSKFileUtils.get_file_info(file)
+                fileinfo = self.get_file_info(file)
                 
                 # create and post artifact on blackboard, if not already existing
                 self.make_blackboard_artifact(file=file, artifact_data={
@@ -11,6 +11,7 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from utils.autopsyplus import FileIngestModulePlus
 from utils.artifact import ArtifactUtils
 from utils.tsk_file import TSKFileUtils
+from utils.vdf_tree import VDFNode
 from utils.module import VERSION, MODULE_FRIENDS
 
 
@@ -36,6 +37,9 @@ class SteamDeckFriendsFIMFactory(IngestModuleFactoryAdapter):
 
 class SteamDeckFriendsFIM(FileIngestModulePlus):
 
+    # key paths of `localconfig.vdf` used by this module
+    VDF_PATHS_LOCALCONFIG = [("UserLocalConfigStore", "friends")]
+
     def __init__(self):
         FileIngestModulePlus.__init__(
             self,
@@ -57,7 +61,9 @@ class SteamDeckFriendsFIM(FileIngestModulePlus):
             return IngestModule.ProcessResult.OK
         
         # extract friends from `localconfig.vdf`
-        friends = self.parse_localconfig_vdf(TSKFileUtils.parse_vdf_file(file))
+        friends = self.parse_localconfig_vdf(
+            TSKFileUtils.parse_vdf_file(
+                file, case=self.case, paths=self.VDF_PATHS_LOCALCONFIG, compact=True))
 
         # create and post artifact(s) on blackboard, if not already existing
         for data in friends:
@@ -66,7 +72,7 @@ class SteamDeckFriendsFIM(FileIngestModulePlus):
         return IngestModule.ProcessResult.OK
 
     def parse_localconfig_vdf(self, dict_localconfig):
-        assert isinstance(dict_localconfig, OrderedDict) or isinstance(dict_localconfig, dict), \
+        assert isinstance(dict_localconfig, (OrderedDict, dict, VDFNode)), \
             "{}: {}".format(type(dict_localconfig), dict_localconfig)
         assert "UserLocalConfigStore" in dict_localconfig, \
             "{} > {}".format(sorted(dict_localconfig.keys()), dict_localconfig)
@@ -14,7 +14,10 @@ from utils.autopsyplus import DataSourceIngestModulePlus
 from utils.artifact import ArtifactUtils
 from utils.timestamp import TimestampUtils
 from utils.tsk_file import TSKFileUtils
+from utils.vdf_binary import AppInfoReader
 from utils.steamcloud import SteamCloudUtils
+from utils.appindex import AppNameIndex
+from utils.apps import AppUtils
 from utils.module import VERSION, MODULE_GAMEAPPS
 
 
@@ -38,6 +41,18 @@ class SteamDeckGameAppsDSIMFactory(IngestModuleFactoryAdapter):
         return SteamDeckGameAppsDSIM()
 
 class SteamDeckGameAppsDSIM(DataSourceIngestModulePlus):
+
+    # key paths of `localconfig.vdf` used by this module
+    VDF_PATHS_LOCALCONFIG = [
+        ("UserLocalConfigStore", "apptickets"),
+        ("UserLocalConfigStore", "nettickets"),
+        ("UserLocalConfigStore", "Software", "Valve", "Steam", "apps"),
+        ("UserLocalConfigStore", "Software", "Valve", "Steam", "LastPlayedTimesSyncTime"),
+    ]
+
+    # app type of non-Steam games and apps added to the library
+    APP_TYPE_SHORTCUT = "Non-Steam Shortcut"
+
     def __init__(self):
         DataSourceIngestModulePlus.__init__(
             self, 
@@ -45,6 +60,7 @@ class SteamDeckGameAppsDSIM(DataSourceIngestModulePlus):
             [
                 ArtifactUtils.ATTR_APP_ID,
                 ArtifactUtils.ATTR_NAME,
+                ArtifactUtils.ATTR_APP_TYPE,
                 ArtifactUtils.ATTR_OWNER_STEAM_ID,
                 ArtifactUtils.ATTR_AUTO_LOGIN_USER,
                 ArtifactUtils.ATTR_INSTALLED,
@@ -69,7 +85,10 @@ class SteamDeckGameAppsDSIM(DataSourceIngestModulePlus):
             ]
         )
 
-        self.app_ids_names = {}
+        # (file name, parent path substring) of relevant files
+        self.file_targets = [("%.acf", None), ("%.vdf", None)]
+
+        self.app_ids_names = None
 
     
     def startUp(self, context):
@@ -78,37 +97,46 @@ class SteamDeckGameAppsDSIM(DataSourceIngestModulePlus):
         dir_plugin = os.path.dirname(os.path.abspath(__file__))
         dir_assets = os.path.join(dir_plugin, "assets")
 
-        # fetch AppID-to-Name dictionary from online source, or read it from disk
+        # fetch AppID-to-Name dictionary from online source, or read it from disk,
+        # as memory-mapped index (built once per content of the JSON dictionary)
         file_apps_latest = os.path.join(dir_assets, "apps_latest.json")
         if SteamCloudUtils.download_app_dictionary(filepath=file_apps_latest):
             self.log("Fetched latest app dictionary from online source.")
-            with open(file_apps_latest, 'r') as f:
-                self.app_ids_names = json.load(f)
-        else:
+            try:
+                self.app_ids_names = AppNameIndex.open_or_build(file_apps_latest)
+            except Exception as e:
+                self.log(msg=file_apps_latest, error=e)
+        if self.app_ids_names is None:
             self.log("Fetched historic app dictionary from disk.")
-            with open(os.path.join(dir_assets, "apps_default.json"), 'r') as f:
-                self.app_ids_names = json.load(f)
+            self.app_ids_names = AppNameIndex.open_or_build(os.path.join(dir_assets, "apps_default.json"))
 
         # conduct sanity checks
-        assert isinstance(self.app_ids_names, dict), \
+        assert isinstance(self.app_ids_names, AppNameIndex), \
             "{}: {}".format(type(self.app_ids_names), self.app_ids_names)
         assert len(self.app_ids_names) > SteamCloudUtils.SANITY_CHECK_MIN_APP_COUNT, \
             "{}".format(len(self.app_ids_names))
+
+    def shutDown(self):
+        DataSourceIngestModulePlus.shutDown(self)
+
+        # release the memory-mapped app index
+        if self.app_ids_names is not None:
+            self.app_ids_names.close()
+            self.app_ids_names = None
     
     def process(self, dataSource, progressBar):
         DataSourceIngestModulePlus.process(self, dataSource, progressBar)
 
         # determine how much work there will be;
         # find relevant files for parsing
-        prefiltered_files = set()
-        prefiltered_files.update(self.fileManager.findFiles(dataSource, "%.acf"))
-        prefiltered_files.update(self.fileManager.findFiles(dataSource, "%.vdf"))
+        prefiltered_files = self.find_files(dataSource)
         self.files = self.__filter_files(prefiltered_files)
 
         # update the progress bar
         self.update_progress()
 
         sources = {}
+        appinfo_files = []
         for file in self.files:
 
             if self.is_job_cancelled():
@@ -117,7 +145,15 @@ class SteamDeckGameAppsDSIM(DataSourceIngestModulePlus):
             try:
                 fname = file.getName()
                 fpath = file.getUniquePath()
-                fcontent = TSKFileUtils.parse_vdf_file(file, case=self.case)
+
+                if fname == "appinfo.vdf":
+                    # e.g., /deck/.local/share/Steam/appcache/appinfo.vdf;
+                    # only enriches apps found elsewhere, and is thus read once all app IDs are known
+                    appinfo_files.append(file)
+                    continue
+
+                fcontent = TSKFileUtils.parse_vdf_file(file, case=self.case, paths=
+                    self.VDF_PATHS_LOCALCONFIG if fname == "localconfig.vdf" else None)
 
                 if re.match(r"appmanifest_\d+\.acf", fname):
                     # e.g., /deck/.local/share/Steam/steamapps/appmanifest_<ID>.acf
@@ -132,6 +168,9 @@ class SteamDeckGameAppsDSIM(DataSourceIngestModulePlus):
                 elif fname == "localconfig.vdf":
                     # e.g., /deck/.local/share/Steam/userdata/<ID>/config/localconfig.vdf
                     d = self.__parse_localconfig_vdf(fcontent)
+                elif fname == "shortcuts.vdf":
+                    # e.g., /deck/.local/share/Steam/userdata/<ID>/config/shortcuts.vdf
+                    d = self.__parse_shortcuts_vdf(fcontent)
                 else:
                     d = None
                     self.log("Unexpected case: {}".format(file.getUniquePath()))
@@ -146,31 +185,9 @@ class SteamDeckGameAppsDSIM(DataSourceIngestModulePlus):
         # update the progress bar
         self.update_progress()
         
-        # get all distinct app IDs found in different sources
-        app_ids = set()
-        for appdata in sources.values():
-            app_ids.update(appdata.keys())
-        app_ids = sorted(app_ids, key=int)
-
-        # prepare dictionary template for each found app
-        dict_apps = {}
-        for app_id in app_ids:
-            dict_apps[app_id] = {}
-            for attr in self.attributes:
-                dict_apps[app_id][attr] = ""
-
-        # merge app information found in different sources
-        for app_id, appdata in dict_apps.items():
-            for _, sourcedata in sources.items():
-                if app_id not in sourcedata:
-                    continue
-                for k, v in sourcedata[app_id].items():
-                    if k in appdata and appdata[k] == "":
-                        appdata[k] = v
-                    elif k in appdata and appdata[k] != "":
-                        assert appdata[k] == v, "{} vs. {}".format(appdata[k], v)
-                    elif k not in appdata:
-                        appdata[k] = v
+        # merge app information found in different sources (e.g., a non-Steam shortcut is found in
+        # both shortcuts.vdf and localconfig.vdf), keeping the first non-empty value per attribute
+        dict_apps = AppUtils.merge_sources(sources, self.attributes, log=self.log)
         
         # for each given app, add app name if app name was not already found,
         # and if the app name was already found, ensure its consistency 
@@ -178,19 +195,25 @@ class SteamDeckGameAppsDSIM(DataSourceIngestModulePlus):
 
         for app_id, appdata in dict_apps.items():
             app_name = ""
-            if app_id in self.app_ids_names:
-                app_name = self.app_ids_names[app_id]
-                app_name = app_name.encode('utf-8').decode('ascii', 'ignore')
+            # a single lookup in the index per app
+            app_name_dict = self.app_ids_names.get(app_id)
+            if app_name_dict is not None:
+                app_name = app_name_dict.encode('utf-8').decode('ascii', 'ignore')
 
             if appdata[ArtifactUtils.ATTR_NAME] == "":
                 appdata[ArtifactUtils.ATTR_NAME] = app_name
 
             elif appdata[ArtifactUtils.ATTR_NAME] != "":
-                if appdata[ArtifactUtils.ATTR_NAME] != self.app_ids_names[app_id]:
+                if app_name_dict is not None \
+                    and appdata[ArtifactUtils.ATTR_NAME] != app_name_dict:
                     appdata[ArtifactUtils.ATTR_NAME] = "{} / {}".format(
                         appdata[ArtifactUtils.ATTR_NAME], app_name
                     )
 
+        # add app names and types from Steam's app info cache, decoding only the records of found apps
+        for file in appinfo_files:
+            self.__enrich_from_appinfo_vdf(file, dict_apps)
+
         # create and post artifact on blackboard, if not already existing,
         # using a mockfile to indicate a file object although we evaluated multiple files
         mockfile = self.get_mockup_file_for_multifile_artifacts(dataSource)
@@ -223,7 +246,7 @@ class SteamDeckGameAppsDSIM(DataSourceIngestModulePlus):
             pattern = r"/deck/(\.local/share/Steam|\.steam)/.*\.(acf|vdf)$"
             if not re.search(pattern, file.getUniquePath()):
                 continue
-            pattern = r"^(appmanifest_\d+|libraryfolders|localconfig|registry)\.(acf|vdf)$"
+            pattern = r"^(appmanifest_\d+|appinfo|libraryfolders|localconfig|registry|shortcuts)\.(acf|vdf)$"
             if not re.match(pattern, file.getName()):
                 continue
 
@@ -231,6 +254,64 @@ class SteamDeckGameAppsDSIM(DataSourceIngestModulePlus):
 
         return filtered_files
 
+    def __enrich_from_appinfo_vdf(self, file, dict_apps):
+        fh = None
+        try:
+            # read on demand instead of extracting the whole cache to disk
+            fh = TSKFileUtils.open_file(file)
+            appinfo = AppInfoReader(fh)
+
+            for app_id, appdata in dict_apps.items():
+                if app_id not in appinfo:
+                    continue
+                try:
+                    common = appinfo.get_common(app_id)
+                except Exception as e:
+                    self.log(msg="{}: app {}".format(file.getUniquePath(), app_id), error=e)
+                    continue
+
+                if appdata[ArtifactUtils.ATTR_NAME] == "" and "name" in common:
+                    appdata[ArtifactUtils.ATTR_NAME] = common["name"]
+                if appdata[ArtifactUtils.ATTR_APP_TYPE] == "" and "type" in common:
+                    appdata[ArtifactUtils.ATTR_APP_TYPE] = str(common["type"])
+
+        except Exception as e:
+            self.log(msg=file.getUniquePath(), error=e)
+
+        finally:
+            TSKFileUtils.close_file(fh)
+
+    def __parse_shortcuts_vdf(self, dict_shortcuts):
+        assert isinstance(dict_shortcuts, OrderedDict) or isinstance(dict_shortcuts, dict), \
+            "{}".format(type(dict_shortcuts))
+        assert "shortcuts" in dict_shortcuts, "{}".format(sorted(dict_shortcuts.keys()))
+
+        dict_apps = {}
+        for _, shortcut in dict_shortcuts["shortcuts"].items():
+            # key case differs between Steam client versions
+            info = dict((k.lower(), v) for k, v in shortcut.items())
+            app_name = info.get("appname", "")
+
+            if "appid" in info:
+                app_id = str(info["appid"] & 0xffffffff)
+            else:
+                # older shortcuts have no app ID, which Steam derives from executable and name
+                app_id = AppUtils.get_shortcut_app_id(info.get("exe", ""), app_name)
+
+            app = {
+                ArtifactUtils.ATTR_APP_ID: app_id,
+                ArtifactUtils.ATTR_NAME: app_name,
+                ArtifactUtils.ATTR_APP_TYPE: self.APP_TYPE_SHORTCUT,
+            }
+            if info.get("lastplaytime"):
+                app[ArtifactUtils.ATTR_LASTPLAYED] = str(info["lastplaytime"])
+                app[ArtifactUtils.ATTR_LASTPLAYED_DATE] = \
+                    TimestampUtils.epoch_to_date_str(info["lastplaytime"])
+
+            dict_apps[app_id] = app
+
+        return dict_apps
+
     def __parse_localconfig_vdf(self, dict_localconfig):
         assert isinstance(dict_localconfig, OrderedDict) or isinstance(dict_localconfig, dict), \
             "{}: {}".format(type(dict_localconfig), dict_localconfig)
@@ -3,14 +3,39 @@
 import os
 import re
 import sys
+import time
+import heapq
+import hashlib
+import datetime
+import itertools
+from collections import OrderedDict
+from java.lang import IllegalArgumentException
+from java.lang import Runtime
+from java.util.concurrent import Callable
+from java.util.concurrent import ExecutionException
+from java.util.concurrent import Executors
+from java.util.concurrent import TimeoutException
+from java.util.concurrent import TimeUnit
+from javax.swing import BoxLayout
+from javax.swing import JCheckBox
+from javax.swing import JLabel
+from javax.swing import JPanel
+from javax.swing import JTextField
+from java.awt import FlowLayout
+from org.sleuthkit.autopsy.ingest import GenericIngestModuleJobSettings
 from org.sleuthkit.autopsy.ingest import IngestModule
 from org.sleuthkit.autopsy.ingest import IngestModuleFactoryAdapter
+from org.sleuthkit.autopsy.ingest import IngestModuleIngestJobSettingsPanel
 
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from utils.autopsyplus import DataSourceIngestModulePlus
 from utils.artifact import ArtifactUtils
+from utils.checkpoint import CheckpointStore
+from utils.logindex import LogEntryIndex
+from utils.sorter import ExternalSorter
+from utils.steamlog import SteamLogParser
 from utils.tsk_file import TSKFileUtils
-from utils.module import VERSION, MODULE_LOG_ENTRIES
+from utils.module import VERSION, MODULE_LOG_ENTRIES, DIRNAME_TEMP
 
 
 class SteamDeckLogEntriesDSIMFactory(IngestModuleFactoryAdapter):
@@ -26,103 +51,56 @@ class SteamDeckLogEntriesDSIMFactory(IngestModuleFactoryAdapter):
     def getModuleVersionNumber(self):
         return "{}".format(VERSION)
 
-    def isDataSourceIngestModuleFactory(self):
-        return True
+    def getDefaultIngestJobSettings(self):
+        return GenericIngestModuleJobSettings()
 
-    def createDataSourceIngestModule(self, _):
-        return SteamDeckLogEntriesDSIM()
+    def hasIngestJobSettingsPanel(self):
+        return True
 
+    def getIngestJobSettingsPanel(self, settings):
+        if not isinstance(settings, GenericIngestModuleJobSettings):
+            raise IllegalArgumentException(
+                "Expected settings argument to be instanceof GenericIngestModuleJobSettings")
+        return SteamDeckLogEntriesSettingsPanel(settings)
 
-class SteamDeckLogEntriesDSIM(DataSourceIngestModulePlus):
-
-    def __init__(self):
-        DataSourceIngestModulePlus.__init__(
-            self,
-            SteamDeckLogEntriesDSIMFactory.moduleName,
-            [
-                ArtifactUtils.ATTR_LOG_TIMESTAMP,
-                ArtifactUtils.ATTR_LOG_MESSAGE,
-                ArtifactUtils.ATTR_FILE_PATH,
-            ]
-        )
-
-    def process(self, dataSource, progressBar):
-        DataSourceIngestModulePlus.process(self, dataSource, progressBar)
+    def isDataSourceIngestModuleFactory(self):
+        return True
 
-        # determine how much work there will be by pre-filtering files
-        self.files = [file for file in self.fileManager.findFiles(dataSource, "%.txt") \
-                 if 'deck/.local/share/Steam/logs/' in file.getUniquePath()]
-        
-        # update the progress bar
-        self.update_progress()
+    def createDataSourceIngestModule(self, settings):
+        return SteamDeckLogEntriesDSIM(settings)
 
-        # parse log entries from files
-        data = []
-        rel_index = 1
 
-        for file in self.files:
-            if self.is_job_cancelled():
-                return IngestModule.ProcessResult.OK
+class SteamDeckLogEntriesDSIM(DataSourceIngestModulePlus):
 
-            try:
-                d, rel_index = self.__process(file, rel_index)
-                if d:
-                    data.extend(d)
-                    for item in d:
-                        if list(item)[2] not in self.file_sources:
-                            self.file_sources[list(item)[2]] = file
+    # number of log files parsed concurrently (0: number of available processors)
+    WORKER_COUNT = 0
 
-            except Exception as e:
-                self.log(msg=file.getUniquePath(), error=e)
+    # number of log entries parsed ahead per log file
+    CHUNK_SIZE = 10000
 
-        # update the progress bar
-        self.update_progress()
-       
-        # sort log entries
-        for d_tuple in sorted(data, key=lambda x: (x[0], x[2], x[3])):
-
-            if self.is_job_cancelled():
-                return IngestModule.ProcessResult.OK
-            
-            # create data object
-            d = self.get_data_template()
-            d[ArtifactUtils.ATTR_LOG_TIMESTAMP] = list(d_tuple)[0]
-            d[ArtifactUtils.ATTR_LOG_MESSAGE] = list(d_tuple)[1]
-            d[ArtifactUtils.ATTR_FILE_PATH] = list(d_tuple)[2]
-            
-            # create and post artifact on blackboard
-            self.make_blackboard_artifact(
-                self.file_sources[d[ArtifactUtils.ATTR_FILE_PATH]], d, skip_fileinfo=True)
-            
-            # update the progress bar
-            self.update_progress()
+    # estimated number of bytes for sorting log files that are out of order,
+    # shared among workers; sorted runs beyond that are spilled to the case temp directory
+    SORT_MEMORY_LIMIT = 512 * 1024 * 1024
 
-        # finish
-        self.shutDown()
-        return IngestModule.ProcessResult.OK
+    # fold consecutive identical messages of a log file into one artifact (default of the job setting)
+    COMPACT_REPEATS = False
 
-    def __process(self, file, rel_index):
-        data = []
+    # additionally index log entries by timestamp in the case module directory
+    WRITE_INDEX = True
 
-        # open log file
-        fh = None
-        try:
-            fh = TSKFileUtils.open_file(file, case=self.case)
-        except Exception as e:
-            self.log(msg=file.getUniquePath(), error=e)
-            TSKFileUtils.close_file(fh)
-            return data
+    # log files whose lines without timestamp continue the previous entry
+    FILENAMES_LOG_CONTINUED = ["controller.txt", "controller_ui.txt", "console_log.txt"]
 
-        # parse log file
-        if file.getName() in [
+    # log files grouped into families that can be selected in the ingest job settings
+    LOG_FAMILIES = OrderedDict([
+        ("Steam Client", [
             "appinfo_log.txt",
-            "bluetoothmanager.txt",
             "bootstrap_log.txt",
-            "client_networkmanager.txt",
             "cloud_log.txt",
             "compat_log.txt",
             "configstore_log.txt",
             "connection_log.txt",
+            "console_log.txt",
             "content_log.txt",
             "durationcontrol_log.txt",
             "librarysharing_log.txt",
@@ -131,68 +109,531 @@ class SteamDeckLogEntriesDSIM(DataSourceIngestModulePlus):
             "shader_log.txt",
             "sitelicense_log.txt",
             "stats_log.txt",
+            "streaming_log.txt",
+            "text_filter_log.txt",
+            "timedtrial_log.txt",
+            "workshop_log.txt"
+        ]),
+        ("Steam UI", [
             "steamui_audio.txt",
             "steamui_html.txt",
             "steamui_system.previous.txt",
             "steamui_system.txt",
             "steamui_update.txt",
-            "streaming_log.txt",
+            "transport_steamui.txt",
+            "webhelper.txt"
+        ]),
+        ("System Managers", [
+            "bluetoothmanager.txt",
+            "client_networkmanager.txt",
             "systemaudiomanager.txt",
             "systemdisplaymanager.txt",
             "systemdockmanager.txt",
             "systemmanager.txt",
-            "systemperfmanager.txt",
-            "text_filter_log.txt",
-            "timedtrial_log.txt",
-            "transport_steamui.txt",
-            "webhelper.txt",
-            "workshop_log.txt"
-        ]:
-            d, rel_index = self.__parse_log_txt(file, fh, rel_index, enable_prev_ts=False)
-            data.extend(d)
+            "systemperfmanager.txt"
+        ]),
+        ("Controller", ["controller.txt", "controller_ui.txt"]),
+    ])
+
+    # keys of the ingest job settings
+    SETTING_MAX_MB = "max_mb_per_file"
+    SETTING_DATE_FROM = "date_from"
+    SETTING_DATE_TO = "date_to"
+    SETTING_FAMILIES = "families"
+    SETTING_COMPACT_REPEATS = "compact_repeats"
+
+    # dates of the date range, optionally with (a prefix of) the time
+    PATTERN_DATE = re.compile(r"^\d{4}-\d{2}-\d{2}( \d{2}(:\d{2}(:\d{2})?)?)?$")
+
+    # number of merged log entries between progress updates
+    PROGRESS_INTERVAL = 1000
+
+    # number of inspected bytes of a log file between progress updates
+    PROGRESS_BYTES = 1024 * 1024
+
+    @staticmethod
+    def get_setting(settings, key, default=""):
+        if settings is None:
+            return default
+        value = settings.getSetting(key)
+        return default if value is None else value
+
+    def __init__(self, settings=None):
+        # resolved first, as the attributes of the artifact type depend on it
+        self.compact_repeats = self.get_setting(
+            settings, self.SETTING_COMPACT_REPEATS, str(self.COMPACT_REPEATS).lower()) == "true"
+
+        attributes = [
+            ArtifactUtils.ATTR_LOG_TIMESTAMP,
+            ArtifactUtils.ATTR_LOG_MESSAGE,
+            ArtifactUtils.ATTR_FILE_PATH,
+        ]
+        if self.compact_repeats:
+            attributes.extend([
+                ArtifactUtils.ATTR_LOG_TIMESTAMP_LAST,
+                ArtifactUtils.ATTR_LOG_REPEAT_COUNT,
+            ])
 
-        elif file.getName() in ["controller.txt", "controller_ui.txt", "console_log.txt"]:
-            d, rel_index = self.__parse_log_txt(file, fh, rel_index, enable_prev_ts=True)
-            data.extend(d)
+        DataSourceIngestModulePlus.__init__(
+            self,
+            SteamDeckLogEntriesDSIMFactory.moduleName,
+            attributes
+        )
 
-        # close log file
-        TSKFileUtils.close_file(fh)
-        
-        return data, rel_index
+        # post the large number of artifacts in batches
+        self.post_batch_size = self.POST_BATCH_SIZE
+
+        # (file name, parent path substring) of relevant files
+        self.file_targets = [("%.txt", "deck/.local/share/Steam/logs/")]
+
+        self.worker_count = self.WORKER_COUNT or Runtime.getRuntime().availableProcessors()
+        self.pool = None
+        self.checkpoints = None
+        self.write_index = self.WRITE_INDEX
+        self.index = None
+        self.index_sources = {}
+
+        # restrict log families, bytes per log file, and log entries to a date range
+        self.filenames = set()
+        families = self.get_setting(settings, self.SETTING_FAMILIES, None)
+        self.families = [family for family in self.LOG_FAMILIES.keys()
+                         if families is None or family in families.split(",")]
+        for family in self.families:
+            self.filenames.update(self.LOG_FAMILIES[family])
+        self.max_bytes = 0
+        try:
+            self.max_bytes = max(0, int(float(self.get_setting(settings, self.SETTING_MAX_MB) or 0) * 1024 * 1024))
+        except ValueError as e:
+            self.log(msg=self.SETTING_MAX_MB, error=e)
+        self.date_from = self.__get_date_setting(settings, self.SETTING_DATE_FROM)
+        self.date_to = self.__get_date_setting(settings, self.SETTING_DATE_TO)
+        if self.date_to and len(self.date_to) < 19:
+            # a date (prefix) includes all timestamps it covers
+            self.date_to += "~"
+
+        self.progress_total = 0
+        self.progress_start = None
+        self.progress_inspected = {}
+
+    def __get_date_setting(self, settings, key):
+        value = self.get_setting(settings, key).strip()
+        if value and not self.PATTERN_DATE.match(value):
+            self.log(msg="Ignoring {} '{}' (expected YYYY-MM-DD [HH:MM:SS])".format(key, value))
+            return None
+        return value or None
+
+    def process(self, dataSource, progressBar):
+        DataSourceIngestModulePlus.process(self, dataSource, progressBar)
 
-    def __parse_log_txt(self, file, fh, rel_index, enable_prev_ts = False):
-        data = []
+        # determine how much work there will be by pre-filtering files of the selected log families
+        self.files = [file for file in self.find_files(dataSource) if file.getName() in self.filenames]
 
-        pattern = r"^\[(\d{4}-\d{2}-\d{2}\s+\d{2}:\d{2}:\d{2})\]\s+(.*)$"
-        pattern_ts = r"^\[(\d{4}-\d{2}-\d{2}\s+\d{2}:\d{2}:\d{2})\]"
-        prev_ts = None
+        # pre-scan file sizes, so that progress of inspecting and parsing is reported in bytes
+        budgets = [self.__get_budget(file.getSize()) for file in self.files]
+        self.__start_progress(budgets + budgets)
+        self.log("Pre-scan: {} log files, {:.1f} MB".format(len(self.files), sum(budgets) / 1048576.0))
 
-        for line in fh.readlines():
-            l = line.strip()
-            if not l:
-                continue
-            
-            if not enable_prev_ts:
-                m = re.match(pattern, l)
-                if m:
-                    t = (m.groups()[0].strip(), m.groups()[1].strip(), 
-                            file.getUniquePath(), rel_index)
-                    data.append(t)
-                    rel_index += 1
+        # load what previous runs in this case already ingested
+        self.checkpoints = CheckpointStore(CheckpointStore.get_path(self.case, "log_entries"))
+
+        # open index of log entries for time-window lookups
+        if self.write_index:
+            try:
+                self.index = LogEntryIndex(LogEntryIndex.get_path(self.case)).open()
+            except Exception as e:
+                self.log(msg=LogEntryIndex.get_path(self.case), error=e)
+                self.index = None
 
+        self.pool = Executors.newFixedThreadPool(max(1, min(self.worker_count, len(self.files))))
+        try:
+            # check concurrently which log files changed, and which are ordered by timestamp
+            futures = [self.pool.submit(LogFileTask(self.__inspect, file)) for file in self.files]
+
+            # turn each new or grown log file into a stream of ordered log entries
+            states = []
+            streams = []
+            for file, future in zip(self.files, futures):
+                state = self.__get_result(future, file, lambda: self.__update_progress([], "inspecting"))
+                if self.is_job_cancelled():
+                    return IngestModule.ProcessResult.OK
+                if state is None or state["skip"]:
+                    continue
+                states.append(state)
+                streams.append(self.__stream(file, state))
+                if file.getUniquePath() not in self.file_sources:
+                    self.file_sources[file.getUniquePath()] = file
+
+            # update the progress bar with what is left after skipping unchanged log files
+            self.__start_progress(list(self.progress_inspected.values()) +
+                                  [self.__get_budget(state["file"].getSize() - state["offset"])
+                                   for state in states])
+
+            # merge log entries of all files by timestamp, and post them as we go
+            for n, entry in enumerate(heapq.merge(*streams)):
+
+                if self.is_job_cancelled():
+                    return IngestModule.ProcessResult.OK
+                
+                # create data object
+                fpath = entry[1]
+                d = self.get_data_template()
+                d[ArtifactUtils.ATTR_LOG_TIMESTAMP] = entry[0]
+                d[ArtifactUtils.ATTR_LOG_MESSAGE] = entry[3]
+                d[ArtifactUtils.ATTR_FILE_PATH] = fpath
+                if self.compact_repeats:
+                    d[ArtifactUtils.ATTR_LOG_TIMESTAMP_LAST] = entry[4]
+                    d[ArtifactUtils.ATTR_LOG_REPEAT_COUNT] = str(entry[5])
+                
+                # create and post artifact on blackboard
+                self.make_blackboard_artifact(self.file_sources[fpath], d, skip_fileinfo=True)
+
+                # add log entry to the index
+                if self.index:
+                    self.__index_entry(entry)
+                
+                # update the progress bar
+                if n % self.PROGRESS_INTERVAL == 0:
+                    self.__update_progress(states)
+
+        finally:
+            self.pool.shutdownNow()
+            self.__close_index()
+
+        # remember how far each log file was ingested, once all of its entries are posted
+        # (log files with entries that failed to post are parsed again next time);
+        # log files restricted to a date range are not ingested entirely
+        self.flush_artifacts()
+        self.__update_progress(states)
+        try:
+            for state in states:
+                if state["file"].getId() in self.failed_file_ids:
+                    continue
+                if state["done"] and not (self.date_from or self.date_to):
+                    self.checkpoints.set(state["file"].getId(), {
+                        "size": state["size"],
+                        "hash": state["hash"],
+                        "entries": state["entries"],
+                        "prev_ts": state["prev_ts"],
+                        "settings": self.__get_checkpoint_settings(),
+                    })
+            self.checkpoints.save()
+        except Exception as e:
+            self.log(msg=self.checkpoints.path, error=e)
+
+        # finish
+        self.shutDown()
+        return IngestModule.ProcessResult.OK
+
+    def __get_checkpoint_settings(self):
+        # settings that change which artifacts a log file yields
+        return {
+            self.SETTING_COMPACT_REPEATS: self.compact_repeats,
+            self.SETTING_FAMILIES: self.families,
+        }
+
+    def __get_budget(self, size):
+        # number of bytes to parse of a log file
+        return min(size, self.max_bytes) if self.max_bytes else size
+
+    def __start_progress(self, sizes):
+        self.progress_total = sum(sizes)
+        if self.progress_start is None:
+            self.progress_start = time.time()
+        self.progressBar.switchToDeterminate(max(1, self.progress_total // 1024))
+
+    def __update_progress(self, states, phase="parsing"):
+        # report inspected and parsed bytes (in KB), and estimate the remaining time of both passes
+        done = sum(self.progress_inspected.values()) + sum(state["read"] for state in states)
+        done = min(done, self.progress_total)
+        eta = "unknown"
+        if done:
+            elapsed = time.time() - self.progress_start
+            eta = str(datetime.timedelta(seconds=int(elapsed * (self.progress_total - done) / done)))
+        self.progressBar.progress("{:.1f} of {:.1f} MB processed ({}), {} remaining".format(
+            done / 1048576.0, self.progress_total / 1048576.0, phase, eta), done // 1024)
+
+    def __index_entry(self, entry):
+        # stop indexing on errors, but keep posting artifacts
+        try:
+            fpath = entry[1]
+            if fpath not in self.index_sources:
+                self.index_sources[fpath] = \
+                    self.index.add_source(self.file_sources[fpath].getId(), fpath)
+            if self.compact_repeats:
+                self.index.add(self.index_sources[fpath], entry[2], entry[0], entry[3],
+                               ts_last=entry[4], repeat_count=entry[5])
             else:
-                m = re.search(pattern_ts, l)
-                if m:
-                    prev_ts = m.groups()[0].strip()
-                    m = re.match(pattern, l)
-                    if m:
-                        t = (m.groups()[0].strip(), m.groups()[1].strip(), 
-                                file.getUniquePath(), rel_index)
-                        data.append(t)
-                        rel_index += 1
+                self.index.add(self.index_sources[fpath], entry[2], entry[0], entry[3])
+        except Exception as e:
+            self.log(msg=self.index.path, error=e)
+            self.__close_index()
+
+    def __close_index(self):
+        if not self.index:
+            return
+        try:
+            self.index.close()
+        except Exception as e:
+            self.log(msg=self.index.path, error=e)
+        self.index = None
+        self.index_sources = {}
+
+    def __get_result(self, future, file, on_wait=None):
+        # wait for the task, but stop waiting if the job is cancelled
+        while not self.is_job_cancelled():
+            try:
+                return future.get(1, TimeUnit.SECONDS)
+            except TimeoutException:
+                if on_wait:
+                    on_wait()
+                continue
+            except ExecutionException as e:
+                self.log(msg=file.getUniquePath(), error=e)
+                return None
+        return None
+
+    def __stream(self, file, state):
+        # parse log entries on the pool, one chunk ahead of the merge
+        entries = self.__parse(file, state) if state["ordered"] else self.__parse_sorted(file, state)
+        if self.date_from or self.date_to:
+            entries = self.__filter_dates(entries)
+        future = self.pool.submit(LogChunkTask(entries, self.CHUNK_SIZE))
+        if self.compact_repeats:
+            return self.__compact(self.__iter_chunks(file, entries, future))
+        return self.__iter_chunks(file, entries, future)
+
+    def __filter_dates(self, entries):
+        for entry in entries:
+            ts = entry[0]
+            if ts is None or (self.date_from and ts < self.date_from) or (self.date_to and ts > self.date_to):
+                continue
+            yield entry
+
+    def __compact(self, entries):
+        # fold consecutive identical messages into (first timestamp, path, index, message,
+        # last timestamp, repeat count)
+        run = None
+        for ts, fpath, rel_index, msg in entries:
+            if run is not None and run[3] == msg:
+                run[4] = ts
+                run[5] += 1
+                continue
+            if run is not None:
+                yield tuple(run)
+            run = [ts, fpath, rel_index, msg, ts, 1]
+        if run is not None:
+            yield tuple(run)
+
+    def __iter_chunks(self, file, entries, future):
+        while future:
+            chunk = self.__get_result(future, file)
+            if not chunk:
+                return
+            future = None
+            if len(chunk) == self.CHUNK_SIZE:
+                future = self.pool.submit(LogChunkTask(entries, self.CHUNK_SIZE))
+            for entry in chunk:
+                yield entry
+
+    def __inspect(self, file):
+        # skip log files queued before the job was cancelled
+        if self.context.isJobCancelled():
+            return None
+
+        # where to start parsing, and what to record as checkpoint afterwards;
+        # log files ingested with other settings are parsed again
+        record = self.checkpoints.get(file.getId())
+        if record and record.get("settings") != self.__get_checkpoint_settings():
+            record = None
+        state = {
+            "file": file, "skip": False, "done": False, "ordered": True,
+            "offset": 0, "entries": 0, "prev_ts": None, "size": 0, "hash": None,
+            "read": 0, "truncated": False,
+        }
+        ts_first = ts_last = None
+
+        # hash complete lines, and check whether timestamps never decrease,
+        # both from the beginning and from the end of the previous run;
+        # with a byte limit, only the lines that will be parsed are read
+        md5 = hashlib.md5()
+        offset = 0
+        report = 0
+        resumed = False
+        ordered = {False: True, True: True}
+        prev_ts = {False: None, True: record["prev_ts"] if record else None}
+
+        fh = TSKFileUtils.open_file(file)
+        try:
+            for line in fh:
+                if self.max_bytes and offset + len(line) > self.max_bytes:
+                    state["truncated"] = True
+                    break
+                if offset >= report:
+                    self.progress_inspected[file.getId()] = offset
+                    report = offset + self.PROGRESS_BYTES
+
+                if record and offset == record["size"]:
+                    resumed = md5.hexdigest() == record["hash"]
+
+                if line.endswith("\n"):
+                    md5.update(line)
+                    state["size"] = offset + len(line)
                 else:
-                    t = (prev_ts, l, file.getUniquePath(), rel_index)
-                    data.append(t)
-                    rel_index += 1
+                    state["hash"] = md5.hexdigest()
+                    md5.update(line)
+                offset += len(line)
+
+                l = line.strip()
+                if not l.startswith("["):
+                    continue
+                ts, _ = SteamLogParser.split(l)
+                if ts is not None:
+                    ts_first = min(ts_first or ts, ts)
+                    ts_last = max(ts_last, ts)
+                    for k in set([False, resumed]):
+                        if prev_ts[k] is not None and ts < prev_ts[k]:
+                            ordered[k] = False
+                        prev_ts[k] = ts
+        finally:
+            TSKFileUtils.close_file(fh)
+        self.progress_inspected[file.getId()] = offset
+
+        if record and offset == record["size"]:
+            resumed = md5.hexdigest() == record["hash"]
+        if state["hash"] is None:
+            state["hash"] = md5.hexdigest()
+        if state["truncated"]:
+            # the rest of a truncated log file is neither hashed nor checked, so it is parsed
+            # from the beginning up to the byte limit again, and never recorded as checkpoint
+            resumed = False
+
+        if resumed:
+            # skip unchanged log files, and parse only what was appended to grown ones
+            state["skip"] = offset == record["size"]
+            state["offset"] = record["size"]
+            state["entries"] = record["entries"]
+            state["prev_ts"] = record["prev_ts"]
+        state["ordered"] = ordered[resumed]
+
+        # skip log files without any timestamp within the date range
+        if (self.date_from and (ts_last is None or ts_last < self.date_from)) \
+            or (self.date_to and (ts_first is None or ts_first > self.date_to)):
+            state["skip"] = True
+
+        return state
+
+    def __parse_sorted(self, file, state):
+        # log entries out of order are sorted within the memory limit of a worker
+        sorter = ExternalSorter(
+            os.path.join(self.case.getTempDirectory(), DIRNAME_TEMP, "sort"),
+            memory_limit=self.SORT_MEMORY_LIMIT // max(1, self.worker_count))
+        for entry in sorter.sort(self.__parse(file, state)):
+            yield entry
+
+    def __parse(self, file, state):
+        # open log file, and continue where the previous run stopped
+        fh = TSKFileUtils.open_file(file)
+        fh.seek(state["offset"])
+
+        # parse log file
+        try:
+            parser = SteamLogParser(
+                file.getUniquePath(), continued=file.getName() in self.FILENAMES_LOG_CONTINUED,
+                index=state["entries"], prev_ts=state["prev_ts"])
+            for entry in parser.parse(self.__read_lines(fh, state)):
+                yield entry
+
+            # record parser state for the checkpoint, unless the log file was truncated
+            state["entries"], state["prev_ts"] = parser.index, parser.prev_ts
+            state["done"] = not state["truncated"]
+
+        # close log file
+        finally:
+            TSKFileUtils.close_file(fh)
+
+    def __read_lines(self, fh, state):
+        # count parsed bytes, and stop at the last complete line within the byte limit
+        for line in fh:
+            if self.max_bytes and state["read"] + len(line) > self.max_bytes:
+                state["truncated"] = True
+                return
+            state["read"] += len(line)
+            yield line
+
+
+class LogFileTask(Callable):
+
+    def __init__(self, func, file):
+        self.func = func
+        self.file = file
+
+    def call(self):
+        return self.func(self.file)
+
+
+class LogChunkTask(Callable):
+
+    def __init__(self, entries, size):
+        self.entries = entries
+        self.size = size
+
+    def call(self):
+        return list(itertools.islice(self.entries, self.size))
+
+
+class SteamDeckLogEntriesSettingsPanel(IngestModuleIngestJobSettingsPanel):
+
+    def __init__(self, settings):
+        self.local_settings = settings
+        self.initComponents()
+        self.customizeComponents()
+
+    def initComponents(self):
+        self.setLayout(BoxLayout(self, BoxLayout.Y_AXIS))
+
+        self.textMaxMB = JTextField(8)
+        self.textDateFrom = JTextField(16)
+        self.textDateTo = JTextField(16)
+        self.add(self.__row(JLabel("Max. MB per log file (0: no limit):"), self.textMaxMB))
+        self.add(self.__row(JLabel("Entries from (YYYY-MM-DD [HH:MM:SS]):"), self.textDateFrom))
+        self.add(self.__row(JLabel("Entries to (YYYY-MM-DD [HH:MM:SS]):"), self.textDateTo))
+
+        self.add(self.__row(JLabel("Log families:")))
+        self.checkBoxFamilies = OrderedDict()
+        for family in SteamDeckLogEntriesDSIM.LOG_FAMILIES:
+            self.checkBoxFamilies[family] = JCheckBox(family)
+            self.add(self.__row(self.checkBoxFamilies[family]))
+
+        self.checkBoxCompactRepeats = JCheckBox("Compact repeated messages")
+        self.add(self.__row(self.checkBoxCompactRepeats))
+
+    def customizeComponents(self):
+        get_setting = SteamDeckLogEntriesDSIM.get_setting
+        self.textMaxMB.setText(get_setting(self.local_settings, SteamDeckLogEntriesDSIM.SETTING_MAX_MB, "0"))
+        self.textDateFrom.setText(get_setting(self.local_settings, SteamDeckLogEntriesDSIM.SETTING_DATE_FROM))
+        self.textDateTo.setText(get_setting(self.local_settings, SteamDeckLogEntriesDSIM.SETTING_DATE_TO))
+
+        # all log families are selected by default
+        families = get_setting(self.local_settings, SteamDeckLogEntriesDSIM.SETTING_FAMILIES, None)
+        for family, checkBox in self.checkBoxFamilies.items():
+            checkBox.setSelected(families is None or family in families.split(","))
+
+        self.checkBoxCompactRepeats.setSelected(get_setting(
+            self.local_settings, SteamDeckLogEntriesDSIM.SETTING_COMPACT_REPEATS,
+            str(SteamDeckLogEntriesDSIM.COMPACT_REPEATS).lower()) == "true")
+
+    def getSettings(self):
+        self.local_settings.setSetting(SteamDeckLogEntriesDSIM.SETTING_MAX_MB, self.textMaxMB.getText().strip())
+        self.local_settings.setSetting(SteamDeckLogEntriesDSIM.SETTING_DATE_FROM, self.textDateFrom.getText().strip())
+        self.local_settings.setSetting(SteamDeckLogEntriesDSIM.SETTING_DATE_TO, self.textDateTo.getText().strip())
+        self.local_settings.setSetting(SteamDeckLogEntriesDSIM.SETTING_FAMILIES, ",".join(
+            family for family, checkBox in self.checkBoxFamilies.items() if checkBox.isSelected()))
+        self.local_settings.setSetting(SteamDeckLogEntriesDSIM.SETTING_COMPACT_REPEATS,
+                                       str(self.checkBoxCompactRepeats.isSelected()).lower())
+        return self.local_settings
 
-        return data, rel_index
+    def __row(self, *components):
+        panel = JPanel(FlowLayout(FlowLayout.LEFT))
+        for component in components:
+            panel.add(component)
+        return panel
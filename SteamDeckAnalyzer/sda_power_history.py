@@ -47,6 +47,12 @@ class SteamDeckPowerHistoryDSIM(DataSourceIngestModulePlus):
                 ArtifactUtils.ATTR_POWERHISTORY_STATUS,
             ]
         )
+
+        # post the large number of artifacts in batches
+        self.post_batch_size = self.POST_BATCH_SIZE
+
+        # (file name, parent path substring) of relevant files
+        self.file_targets = [("history-%", None)]
     
     def startUp(self, context):
         DataSourceIngestModulePlus.startUp(self, context)
@@ -55,7 +61,7 @@ class SteamDeckPowerHistoryDSIM(DataSourceIngestModulePlus):
         DataSourceIngestModulePlus.process(self, dataSource, progressBar)
 
         # determine how much work there will be by pre-filtering files
-        self.files = self.fileManager.findFiles(dataSource, "history-%")
+        self.files = self.find_files(dataSource)
 
         # update the progress bar
         self.update_progress()
@@ -105,9 +111,9 @@ class SteamDeckPowerHistoryDSIM(DataSourceIngestModulePlus):
 
         try:
             type_ = " ".join(map(str.title, str(file.getName()).split('-')[0:2]))
-            fh = TSKFileUtils.open_file(file=file, case=self.case)
+            fh = TSKFileUtils.open_file(file=file)
 
-            for line in fh.readlines():
+            for line in fh:
                 l = line.strip()
                 if not l:
                     continue
@@ -37,6 +37,13 @@ class SteamDeckSecretsFIMFactory(IngestModuleFactoryAdapter):
 
 class SteamDeckSecretsFIM(FileIngestModulePlus):
 
+    # key paths of `localconfig.vdf` used by this module
+    VDF_PATHS_LOCALCONFIG = [
+        ("UserLocalConfigStore", "CloudKey"),
+        ("UserLocalConfigStore", "CloudKeyCRC"),
+        ("UserLocalConfigStore", "SharedAuth"),
+    ]
+
     def __init__(self):
         FileIngestModulePlus.__init__(
             self,
@@ -97,7 +104,7 @@ class SteamDeckSecretsFIM(FileIngestModulePlus):
 
         fh = None
         try:
-            fh = TSKFileUtils.open_file(file=file, case=self.case)
+            fh = TSKFileUtils.open_file(file=file)
             d = json.load(fh)
             if 'media' in d:
                 if 'device_id_salt' in d['media']:
@@ -183,9 +190,9 @@ class SteamDeckSecretsFIM(FileIngestModulePlus):
 
         fh = None
         try:
-            fh = TSKFileUtils.open_file(file, case=self.case)
+            fh = TSKFileUtils.open_file(file)
 
-            for line in fh.readlines():
+            for line in fh:
 
                 try:
                     l = line.strip()
@@ -221,7 +228,8 @@ class SteamDeckSecretsFIM(FileIngestModulePlus):
         #
 
         try:
-            dict_localconfig = TSKFileUtils.parse_vdf_file(file, case=self.case)
+            dict_localconfig = TSKFileUtils.parse_vdf_file(
+                file, case=self.case, paths=self.VDF_PATHS_LOCALCONFIG)
             assert "UserLocalConfigStore" in dict_localconfig, \
                 "{} > {}".format(sorted(dict_localconfig.keys()), dict_localconfig)
             data = dict_localconfig["UserLocalConfigStore"]
@@ -12,6 +12,7 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from utils.autopsyplus import DataSourceIngestModulePlus
 from utils.artifact import ArtifactUtils
 from utils.tsk_file import TSKFileUtils
+from utils.vdf_tree import VDFNode
 from utils.timestamp import TimestampUtils
 from utils.module import VERSION, MODULE_USERS
 
@@ -38,6 +39,9 @@ class SteamDeckUsersDSIMFactory(IngestModuleFactoryAdapter):
 
 class SteamDeckUsersDSIM(DataSourceIngestModulePlus):
 
+    # key paths of `localconfig.vdf` used by this module
+    VDF_PATHS_LOCALCONFIG = [("UserLocalConfigStore", "friends")]
+
     def __init__(self):
         DataSourceIngestModulePlus.__init__(
             self,
@@ -59,6 +63,9 @@ class SteamDeckUsersDSIM(DataSourceIngestModulePlus):
             ]
         )
 
+        # (file name, parent path substring) of relevant files
+        self.file_targets = [("%.vdf", None)]
+
     def startUp(self, context):
         DataSourceIngestModulePlus.startUp(self, context)
 
@@ -66,7 +73,7 @@ class SteamDeckUsersDSIM(DataSourceIngestModulePlus):
         DataSourceIngestModulePlus.process(self, dataSource, progressBar)
 
         # determine how much work there will be by pre-filtering files
-        self.files = self.fileManager.findFiles(dataSource, "%.vdf")
+        self.files = self.find_files(dataSource)
 
         # update the progress bar
         self.update_progress()
@@ -82,14 +89,15 @@ class SteamDeckUsersDSIM(DataSourceIngestModulePlus):
 
             if file.getName() == 'loginusers.vdf':
                 sources[file.getUniquePath()] = \
-                    self.__parse_loginusers_vdf(TSKFileUtils.parse_vdf_file(file))
+                    self.__parse_loginusers_vdf(TSKFileUtils.parse_vdf_file(file, case=self.case))
                 
             elif file.getName() == 'localconfig.vdf':
                 sources[file.getUniquePath()] = \
-                    self.__parse_localconfig_vdf(TSKFileUtils.parse_vdf_file(file))
+                    self.__parse_localconfig_vdf(TSKFileUtils.parse_vdf_file(
+                        file, case=self.case, paths=self.VDF_PATHS_LOCALCONFIG, compact=True))
             
             elif file.getName() == 'registry.vdf':
-                user = self.__parse_registry_vdf(TSKFileUtils.parse_vdf_file(file))
+                user = self.__parse_registry_vdf(TSKFileUtils.parse_vdf_file(file, case=self.case))
                 if user:
                     sources[file.getUniquePath()] = user
 
@@ -181,7 +189,7 @@ class SteamDeckUsersDSIM(DataSourceIngestModulePlus):
         return ""
 
     def __parse_localconfig_vdf(self, dict_localconfig):
-        assert isinstance(dict_localconfig, OrderedDict) or isinstance(dict_localconfig, dict), \
+        assert isinstance(dict_localconfig, (OrderedDict, dict, VDFNode)), \
             "{}: {}".format(type(dict_localconfig), dict_localconfig)
         assert "UserLocalConfigStore" in dict_localconfig, \
             "{} > {}".format(sorted(dict_localconfig.keys()), dict_localconfig)
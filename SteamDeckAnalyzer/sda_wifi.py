@@ -118,7 +118,7 @@ class SteamDeckWiFiFIM(FileIngestModulePlus):
             ArtifactUtils.ATTR_OTHER: {}
         }
 
-        for line in fh.readlines():
+        for line in fh:
             l = line.strip()
             match = re.search(r'Auto-generated from NetworkManager connection "([^"]*)"', l)
             if match: 
@@ -146,7 +146,7 @@ class SteamDeckWiFiFIM(FileIngestModulePlus):
             ArtifactUtils.ATTR_OTHER: {}
         }
 
-        for line in fh.readlines():
+        for line in fh:
             match = re.match(r'([^=]*)=(.*)', line.strip())
             if match:
                 assert len(match.groups()) == 2
@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+
+import os
+import glob
+import json
+import struct
+import hashlib
+import tempfile
+
+try:
+    # Jython: map the index via Java NIO
+    import jarray
+    from java.io import RandomAccessFile
+    from java.nio import ByteOrder
+    from java.nio.channels import FileChannel
+    mmap = None
+except ImportError:
+    import mmap
+
+
+class AppNameIndex(object):
+
+    # magic, version, number of apps; followed by sorted app IDs (uint32), offsets of names
+    # (uint32, one more than apps) into the blob of UTF-8 names, and the blob itself
+    HEADER = struct.Struct("<4sII")
+    MAGIC = "SDAI"
+    VERSION = 1
+
+    @staticmethod
+    def write(path, apps):
+        # write index of {<APP_ID>: <APP_NAME>, ...}; app IDs that are no numbers are skipped
+        entries = []
+        for app_id, name in apps.items():
+            app_id = str(app_id)
+            if not app_id.isdigit() or int(app_id) > 0xffffffff:
+                continue
+            if isinstance(name, unicode):
+                name = name.encode("utf-8")
+            entries.append((int(app_id), name or ""))
+        entries.sort()
+
+        ids = []
+        offsets = [0]
+        for app_id, name in entries:
+            ids.append(app_id)
+            offsets.append(offsets[-1] + len(name))
+
+        # move the index into place once it is complete; an existing index is never replaced,
+        # as Windows refuses to delete or overwrite a file that is still mapped, and it is
+        # equivalent anyway, as indices are named after their content (see `get_path`)
+        fd, path_tmp = tempfile.mkstemp(suffix=".tmp", dir=os.path.dirname(os.path.abspath(path)))
+        with os.fdopen(fd, "wb") as f:
+            f.write(AppNameIndex.HEADER.pack(AppNameIndex.MAGIC, AppNameIndex.VERSION, len(entries)))
+            f.write(struct.pack("<{}I".format(len(ids)), *ids))
+            f.write(struct.pack("<{}I".format(len(offsets)), *offsets))
+            f.write("".join(name for _, name in entries))
+        try:
+            if not os.path.exists(path):
+                os.rename(path_tmp, path)
+        except OSError:
+            # another ingest job may have written the same index in the meantime
+            if not os.path.exists(path):
+                raise
+        finally:
+            if os.path.exists(path_tmp):
+                os.remove(path_tmp)
+        return len(entries)
+
+    @staticmethod
+    def get_path(path_json):
+        # indices are named after the content of their app dictionary, e.g., apps_latest.<MD5>.idx
+        md5 = hashlib.md5()
+        with open(path_json, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), ""):
+                md5.update(chunk)
+        return "{}.{}.idx".format(os.path.splitext(path_json)[0], md5.hexdigest()[:16])
+
+    @staticmethod
+    def build(path_json, path=None):
+        # convert an app dictionary as written by `SteamCloudUtils.download_app_dictionary`,
+        # unless its index exists already; return the path of the index
+        path = path or AppNameIndex.get_path(path_json)
+        if not os.path.exists(path):
+            with open(path_json, "r") as f:
+                AppNameIndex.write(path, json.load(f))
+        return path
+
+    @staticmethod
+    def open_or_build(path_json):
+        # open the index of the app dictionary's current content, building it if needed
+        path = AppNameIndex.build(path_json)
+        AppNameIndex.remove_stale(path_json, path)
+        return AppNameIndex(path)
+
+    @staticmethod
+    def remove_stale(path_json, path):
+        # remove indices of previous contents of the app dictionary; those still mapped
+        # (on Windows) are left for a later run
+        for path_stale in glob.glob("{}.*.idx".format(os.path.splitext(path_json)[0])):
+            if os.path.abspath(path_stale) == os.path.abspath(path):
+                continue
+            try:
+                os.remove(path_stale)
+            except OSError:
+                pass
+
+    def __init__(self, path):
+        self.path = path
+
+        if mmap is None:
+            f = RandomAccessFile(path, "r")
+            try:
+                channel = f.getChannel()
+                self.buffer = channel.map(FileChannel.MapMode.READ_ONLY, 0, channel.size())
+                self.buffer.order(ByteOrder.LITTLE_ENDIAN)
+            finally:
+                # the mapping stays valid after closing the file
+                f.close()
+            header = self.__read_bytes(0, self.HEADER.size)
+        else:
+            with open(path, "rb") as f:
+                self.buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            header = self.buffer[:self.HEADER.size]
+
+        magic, version, self.count = self.HEADER.unpack(header)
+        if magic != self.MAGIC or version != self.VERSION:
+            raise ValueError("Unknown app index: {}".format(path))
+
+        self.offset_ids = self.HEADER.size
+        self.offset_offsets = self.offset_ids + 4 * self.count
+        self.offset_names = self.offset_offsets + 4 * (self.count + 1)
+
+    def close(self):
+        # Java has no way to unmap a buffer; it is unmapped once garbage collected
+        if mmap is not None and self.buffer is not None:
+            self.buffer.close()
+        self.buffer = None
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, app_id):
+        return self.__find(app_id) >= 0
+
+    def __getitem__(self, app_id):
+        name = self.get(app_id)
+        if name is None:
+            raise KeyError(app_id)
+        return name
+
+    def get(self, app_id, default=None):
+        # return the app name as unicode, like the JSON dictionary did
+        i = self.__find(app_id)
+        if i < 0:
+            return default
+        start = self.__read_uint(self.offset_offsets + 4 * i)
+        end = self.__read_uint(self.offset_offsets + 4 * (i + 1))
+        return self.__read_bytes(self.offset_names + start, end - start).decode("utf-8")
+
+    def __find(self, app_id):
+        # binary search for the position of the app ID, or -1
+        app_id = str(app_id)
+        if not app_id.isdigit():
+            return -1
+        app_id = int(app_id)
+
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            value = self.__read_uint(self.offset_ids + 4 * mid)
+            if value < app_id:
+                lo = mid + 1
+            elif value > app_id:
+                hi = mid
+            else:
+                return mid
+        return -1
+
+    def __read_uint(self, offset):
+        if mmap is None:
+            return self.buffer.getInt(offset) & 0xffffffff
+        return struct.unpack_from("<I", self.buffer, offset)[0]
+
+    def __read_bytes(self, offset, length):
+        if mmap is None:
+            data = jarray.zeros(length, "b")
+            if length:
+                # a duplicate keeps the position of the shared buffer untouched
+                view = self.buffer.duplicate()
+                view.position(offset)
+                view.get(data)
+            return data.tostring()
+        return self.buffer[offset:offset + length]
@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+
+import zlib
+
+
+class AppUtils:
+
+    @staticmethod
+    def get_shortcut_app_id(exe, name):
+        # Steam derives the app ID of a non-Steam shortcut from the UTF-8 bytes of executable and
+        # name (non-ASCII strings are read as unicode), the same ID localconfig.vdf refers to
+        key = "".join(s.encode("utf-8") if isinstance(s, unicode) else s for s in [exe, name])
+        return str(zlib.crc32(key) & 0xffffffff | 0x80000000)
+
+    @staticmethod
+    def merge_sources(sources, attributes, log=None):
+        # merge {<PATH>: {<APP_ID>: {<ATTR>: <VALUE>, ...}, ...}, ...} into one dictionary per app;
+        # sources are read in order of their paths, and the first non-empty value of an attribute
+        # is kept, while differing values of later sources are only logged
+        dict_apps = {}
+        for path, sourcedata in sorted(sources.items()):
+            for app_id, data in sourcedata.items():
+                if app_id not in dict_apps:
+                    dict_apps[app_id] = dict((attr, "") for attr in attributes)
+                appdata = dict_apps[app_id]
+                for k, v in data.items():
+                    if appdata.get(k, "") == "":
+                        appdata[k] = v
+                    elif v != "" and appdata[k] != v and log:
+                        log("App {}: kept {} {!r}, ignored {!r} of {!r}".format(
+                            app_id, k, appdata[k], v, path))
+        return dict_apps
@@ -68,6 +68,7 @@ class ArtifactUtils:
     ATTR_DATE_CR = '{}DATE_CR'.format(PREFIX_ATTR)
     ATTR_DATE_C = '{}DATE_C'.format(PREFIX_ATTR)
     ATTR_APP_ID = '{}ID_APP'.format(PREFIX_ATTR)
+    ATTR_APP_TYPE = '{}APP_TYPE'.format(PREFIX_ATTR)
     ATTR_FRIEND_ID = '{}ID_FRIEND'.format(PREFIX_ATTR)
     ATTR_STEAM_ID = '{}STEAM_ID'.format(PREFIX_ATTR)
     ATTR_NAME = '{}NAME'.format(PREFIX_ATTR)
@@ -155,6 +156,8 @@ class ArtifactUtils:
     ATTR_WEB_QUOTAMANAGER_LAST_MODIFIED_UTC = '{}WEB_QUOTAMANAGER_LAST_MODIFIED_UTC'.format(PREFIX_ATTR)
     ATTR_LOG_TIMESTAMP = '{}LOG_TIMESTAMP'.format(PREFIX_ATTR)
     ATTR_LOG_MESSAGE = '{}LOG_MESSAGE'.format(PREFIX_ATTR)
+    ATTR_LOG_TIMESTAMP_LAST = '{}LOG_TIMESTAMP_LAST'.format(PREFIX_ATTR)
+    ATTR_LOG_REPEAT_COUNT = '{}LOG_REPEAT_COUNT'.format(PREFIX_ATTR)
     ATTR_DEVICE_KEY = '{}DEVICE_KEY'.format(PREFIX_ATTR)
     ATTR_DEVICE_VALUE = '{}DEVICE_VALUE'.format(PREFIX_ATTR)
     ATTR_POWERHISTORY_TIMESTAMP = '{}POWERHISTORY_TIMESTAMP'.format(PREFIX_ATTR)
@@ -198,6 +201,7 @@ class ArtifactUtils:
         ATTR_EPOCH2DATE: {'type': TSK_TYPE_STR, 'label': 'Timestamp (Epoch to Date)'},
         ATTR_TIMESTAMP_INTERPRETATION: {'type': TSK_TYPE_STR, 'label': 'Timestamp Interpretation'},
         ATTR_APP_ID: {'type': TSK_TYPE_STR, 'label': 'App ID'},
+        ATTR_APP_TYPE: {'type': TSK_TYPE_STR, 'label': 'App Type'},
         ATTR_FRIEND_ID: {'type': TSK_TYPE_STR, 'label': 'Friend ID'},
         ATTR_TIMESTAMP: {'type': TSK_TYPE_STR, 'label': 'Timestamp'},
         ATTR_SSID: {'type': TSK_TYPE_STR, 'label': 'SSID'},
@@ -282,6 +286,8 @@ class ArtifactUtils:
         ATTR_WEB_QUOTAMANAGER_LAST_MODIFIED_UTC: {'type': TSK_TYPE_STR, 'label': 'Last Modified (UTC)'},
         ATTR_LOG_TIMESTAMP: {'type': TSK_TYPE_STR, 'label': 'Timestamp'},
         ATTR_LOG_MESSAGE: {'type': TSK_TYPE_STR, 'label': 'Message'},
+        ATTR_LOG_TIMESTAMP_LAST: {'type': TSK_TYPE_STR, 'label': 'Last Timestamp'},
+        ATTR_LOG_REPEAT_COUNT: {'type': TSK_TYPE_STR, 'label': 'Repeat Count'},
         ATTR_DEVICE_KEY: {'type': TSK_TYPE_STR, 'label': 'Information'},
         ATTR_DEVICE_VALUE: {'type': TSK_TYPE_STR, 'label': 'Value'},
         
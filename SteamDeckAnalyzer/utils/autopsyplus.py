@@ -1,11 +1,13 @@
 # -*- coding: utf-8 -*-
 
 import inspect
+import threading
 import traceback
 from collections import OrderedDict
 from java.util import ArrayList
 from java.util.logging import Level
 from org.sleuthkit.datamodel import BlackboardAttribute
+from org.sleuthkit.datamodel import TskData
 from org.sleuthkit.autopsy.datamodel import ContentUtils
 from org.sleuthkit.autopsy.casemodule import Case
 from org.sleuthkit.autopsy.coreutils import Logger
@@ -14,10 +16,24 @@ from org.sleuthkit.autopsy.ingest import DataSourceIngestModule
 from org.sleuthkit.autopsy.ingest.IngestModule import IngestModuleException
 
 from utils.artifact import ArtifactUtils
+from utils.cache import ExtractedFileCache, ParsedDocumentCache
+from utils.catalog import FileCatalog
 from utils.tsk_file import TSKFileUtils
 
 
 class IngestModulePlus(object):
+
+    # duplicate check IDs per artifact type and ingest job, shared among module instances
+    _duplicate_check_ids = {}
+    _duplicate_check_ids_refs = {}
+    _duplicate_check_ids_lock = threading.Lock()
+
+    # number of artifacts per batch for modules that post artifacts in batches
+    POST_BATCH_SIZE = 1000
+
+    # maximum number of files whose file information is memoized
+    FILE_INFO_MEMO_SIZE = 1024
+
     def __init__(self, moduleName, attributes):
         self.moduleName = moduleName
         self.artifact_type_label = ArtifactUtils.get_module_artifact_label(self.moduleName)
@@ -32,6 +48,22 @@ class IngestModulePlus(object):
         self.skCase = None
         self.blackboard = None
         self.artifact_type = None
+        self.attribute_types = None
+        self.attribute_type_lookups_avoided = 0
+        self.duplicate_check_ids = None
+        self.duplicate_check_ids_key = None
+        self.caches_case = None
+
+        # post artifacts immediately (0), or buffer them and post them in batches (>0)
+        self.post_batch_size = 0
+        self.pending_artifacts = []
+
+        # IDs of files whose artifacts could not all be posted
+        self.failed_file_ids = set()
+
+        # file information declared as attributes, memoized per file ID
+        self.file_info_attributes = None
+        self.file_info_memo = {}
 
         self._logger = Logger.getLogger(self.moduleName)
 
@@ -45,18 +77,53 @@ class IngestModulePlus(object):
         self.artifact_type = self.blackboard.getOrAddArtifactType(
             self.artifact_type_label, self.moduleName)
 
-        # create artifact attributes and set corresponding member variables
+        # create artifact attributes, and keep their types for building artifacts
+        self.attribute_types = {}
+        self.attribute_type_lookups_avoided = 0
         for key_attr in self.attributes:
-            self.blackboard.getOrAddAttributeType(key_attr, 
+            self.attribute_types[key_attr] = self.blackboard.getOrAddAttributeType(key_attr, 
                                        ArtifactUtils.get_attribute_type(key_attr),
                                        ArtifactUtils.get_attribute_label(key_attr))
 
+        # determine which file information is needed for artifacts of this module
+        self.file_info_attributes = set(
+            attr for attr in self.attributes if attr in ArtifactUtils.ATTRIBUTES_FILE)
+        self.file_info_memo = {}
+        self.failed_file_ids = set()
+
+        # load duplicate check IDs of existing artifacts once per ingest job
+        self.__load_duplicate_check_ids()
+
+        # keep the caches of the case until the last module using them is shut down
+        ExtractedFileCache.register(self.case)
+        ParsedDocumentCache.register(self.case)
+        self.caches_case = self.case
+
     def shutDown(self):
-        pass
+        self.flush_artifacts()
+
+        # log statistics once, even if the module is shut down more than once
+        if self.duplicate_check_ids_key is not None:
+            self.__log_stats()
+        self.__release_duplicate_check_ids()
+        self.__release_caches()
 
     def is_job_cancelled(self):
         # check if the user pressed cancel while we were busy
-        return self.context.isJobCancelled()
+        if self.context.isJobCancelled():
+            # post what has been buffered so far
+            self.flush_artifacts()
+            return True
+        return False
+
+    def get_file_info(self, file):
+        file_id = file.getId()
+        if file_id not in self.file_info_memo:
+            if len(self.file_info_memo) >= self.FILE_INFO_MEMO_SIZE:
+                self.file_info_memo.clear()
+            self.file_info_memo[file_id] = \
+                TSKFileUtils.get_file_info(file, attributes=self.file_info_attributes)
+        return self.file_info_memo[file_id]
 
     def get_data_template(self):
         data = OrderedDict()
@@ -78,10 +145,61 @@ class IngestModulePlus(object):
         if self.__is_data_object_duplicate(artifact_type_id, data):
             return
 
+        # buffer data object to create and post artifacts in batches
+        if self.post_batch_size > 0:
+            self.pending_artifacts.append((file, data))
+            if len(self.pending_artifacts) >= self.post_batch_size:
+                self.flush_artifacts()
+            return
+
         # create new artifact object, and post new artifact on blackboard
         artifact = self.__create_artifact_object(artifact_type_id, data, file)
         if artifact:
             self.blackboard.postArtifact(artifact, self.moduleName, self.context.getJobId())
+        else:
+            self.__discard_duplicate_check_id(data)
+            self.failed_file_ids.add(file.getId())
+
+    def flush_artifacts(self):
+        # return whether all buffered artifacts were posted; files of those that were not are
+        # remembered in `failed_file_ids`
+        if not self.pending_artifacts:
+            return True
+
+        pending = self.pending_artifacts
+        self.pending_artifacts = []
+
+        # create buffered artifacts within a single transaction
+        artifacts = ArrayList()
+        transaction = None
+        try:
+            transaction = self.skCase.beginTransaction()
+            for file, data in pending:
+                artifacts.add(self.blackboard.newDataArtifact(
+                    self.artifact_type, file.getId(), file.getDataSourceObjectId(),
+                    self.__create_attributes(data), None, transaction))
+            transaction.commit()
+
+        except Exception as e:
+            self.log(msg="{} artifacts".format(len(pending)), error=e)
+            if transaction:
+                try:
+                    transaction.rollback()
+                except Exception as e:
+                    self.log(msg="rollback", error=e)
+            for file, data in pending:
+                self.__discard_duplicate_check_id(data)
+                self.failed_file_ids.add(file.getId())
+            return False
+
+        # post all artifacts of the batch at once
+        try:
+            self.blackboard.postArtifacts(artifacts, self.moduleName, self.context.getJobId())
+        except Exception as e:
+            self.log(msg="{} artifacts".format(artifacts.size()), error=e)
+            self.failed_file_ids.update(file.getId() for file, _ in pending)
+            return False
+        return True
 
     def __create_data_object(self, file, artifact_data, skip_fileinfo=False):
         try:
@@ -90,7 +208,7 @@ class IngestModulePlus(object):
             data.update(artifact_data)
 
             if not skip_fileinfo:
-                for k, v in TSKFileUtils.get_file_info(file).items():
+                for k, v in self.get_file_info(file).items():
                     if k not in data or (data[k] == "" and v != ""):
                         data.update({k: v})
             
@@ -106,33 +224,103 @@ class IngestModulePlus(object):
     
     def __is_data_object_duplicate(self, artifact_type_id, data):
         try:
-            for artifact in self.skCase.getBlackboardArtifacts(artifact_type_id):
-                attr_type = self.blackboard.getOrAddAttributeType(
-                    ArtifactUtils.ATTR_DUPLICATE_CHECK_ID, 
-                    ArtifactUtils.get_attribute_type(ArtifactUtils.ATTR_DUPLICATE_CHECK_ID),
-                    ArtifactUtils.get_attribute_label(ArtifactUtils.ATTR_DUPLICATE_CHECK_ID))
-                attr = artifact.getAttribute(attr_type)
-                if attr and attr.getValueString() == data[ArtifactUtils.ATTR_DUPLICATE_CHECK_ID]:
+            # look up duplicate check ID, and reserve it if it is new
+            duplicate_check_id = data[ArtifactUtils.ATTR_DUPLICATE_CHECK_ID]
+            with IngestModulePlus._duplicate_check_ids_lock:
+                if duplicate_check_id in self.duplicate_check_ids:
                     return True
+                self.duplicate_check_ids.add(duplicate_check_id)
             return False
         
         except Exception as e:
             self.log(msg=artifact_type_id, error=e)
             return True
+
+    def __discard_duplicate_check_id(self, data):
+        with IngestModulePlus._duplicate_check_ids_lock:
+            self.duplicate_check_ids.discard(data[ArtifactUtils.ATTR_DUPLICATE_CHECK_ID])
+
+    def __load_duplicate_check_ids(self):
+        artifact_type_id = self.artifact_type.getTypeID()
+        self.duplicate_check_ids_key = (artifact_type_id, self.context.getJobId())
+
+        with IngestModulePlus._duplicate_check_ids_lock:
+            key = self.duplicate_check_ids_key
+            if key not in IngestModulePlus._duplicate_check_ids:
+                IngestModulePlus._duplicate_check_ids[key] = \
+                    self.__query_duplicate_check_ids(artifact_type_id)
+                IngestModulePlus._duplicate_check_ids_refs[key] = 0
+            IngestModulePlus._duplicate_check_ids_refs[key] += 1
+            self.duplicate_check_ids = IngestModulePlus._duplicate_check_ids[key]
+
+    def __log_stats(self):
+        if self.attribute_type_lookups_avoided:
+            self.log("Avoided {} attribute type lookups".format(self.attribute_type_lookups_avoided))
+            self.attribute_type_lookups_avoided = 0
+
+        try:
+            self.log("Extracted file cache: {}".format(
+                ExtractedFileCache.get_instance(self.case).get_stats()))
+            self.log("Parsed document cache: {}".format(
+                ParsedDocumentCache.get_instance(self.case).get_stats()))
+            self.log("VDF parsers: {}".format(TSKFileUtils.get_vdf_parser_stats()))
+        except Exception as e:
+            self.log(msg="Cache statistics", error=e)
+
+    def __release_duplicate_check_ids(self):
+        with IngestModulePlus._duplicate_check_ids_lock:
+            key = self.duplicate_check_ids_key
+            self.duplicate_check_ids_key = None
+            if key not in IngestModulePlus._duplicate_check_ids_refs:
+                return
+            IngestModulePlus._duplicate_check_ids_refs[key] -= 1
+            if IngestModulePlus._duplicate_check_ids_refs[key] <= 0:
+                del IngestModulePlus._duplicate_check_ids_refs[key]
+                del IngestModulePlus._duplicate_check_ids[key]
+
+    def __release_caches(self):
+        if self.caches_case is None:
+            return
+        ExtractedFileCache.unregister(self.caches_case)
+        ParsedDocumentCache.unregister(self.caches_case)
+        self.caches_case = None
+
+    def __query_duplicate_check_ids(self, artifact_type_id):
+        attr_type = self.attribute_types[ArtifactUtils.ATTR_DUPLICATE_CHECK_ID]
+
+        duplicate_check_ids = set()
+
+        # fetch all duplicate check IDs of the artifact type with a single query
+        query = None
+        try:
+            query = self.skCase.executeQuery(
+                "SELECT attrs.value_text AS value_text FROM blackboard_attributes AS attrs "
+                "INNER JOIN blackboard_artifacts AS arts ON attrs.artifact_id = arts.artifact_id "
+                "WHERE arts.artifact_type_id = {} AND attrs.attribute_type_id = {}".format(
+                    artifact_type_id, attr_type.getTypeID()))
+            results = query.getResultSet()
+            while results.next():
+                duplicate_check_ids.add(results.getString("value_text"))
+            return duplicate_check_ids
+
+        except Exception as e:
+            self.log(msg=artifact_type_id, error=e)
+
+        finally:
+            if query:
+                query.close()
+
+        # fall back to walking the artifacts of the artifact type once
+        for artifact in self.skCase.getBlackboardArtifacts(artifact_type_id):
+            attr = artifact.getAttribute(attr_type)
+            if attr:
+                duplicate_check_ids.add(attr.getValueString())
+        return duplicate_check_ids
     
     def __create_artifact_object(self, artifact_type_id, data, file):
         try:
             artifact = file.newArtifact(artifact_type_id)
-            
-            attrs = ArrayList()
-            for key_attr in self.attributes:
-                if key_attr in data:
-                    attr = self.blackboard.getOrAddAttributeType(key_attr, 
-                        ArtifactUtils.get_attribute_type(key_attr),
-                        ArtifactUtils.get_attribute_label(key_attr))
-                    attrs.add(BlackboardAttribute(attr, self.moduleName, data[key_attr]))
-            
-            artifact.addAttributes(attrs)
+            artifact.addAttributes(self.__create_attributes(data))
 
             return artifact
         
@@ -140,6 +328,15 @@ class IngestModulePlus(object):
             self.log(msg=artifact_type_id, error=e)
             return None
 
+    def __create_attributes(self, data):
+        attrs = ArrayList()
+        for key_attr in self.attributes:
+            if key_attr in data:
+                attr = self.attribute_types[key_attr]
+                self.attribute_type_lookups_avoided += 1
+                attrs.add(BlackboardAttribute(attr, self.moduleName, data[key_attr]))
+        return attrs
+
     def log(self, msg, error=None):
         name =  self.__class__.__name__
         stack = inspect.stack()[1][3]
@@ -180,12 +377,23 @@ class DataSourceIngestModulePlus(IngestModulePlus, DataSourceIngestModule):
         self.fileManager = None
         self.progress_count = None
 
+        # (file name, parent path substring) of the files the module is interested in
+        self.file_targets = None
+        self.file_catalog_job_id = None
+        self.mockup_files = {}
+
     def startUp(self, context):
         IngestModulePlus.startUp(self, context)
         self.files = []
         self.file_sources = {}
         self.fileManager = Case.getCurrentCase().getServices().getFileManager()
         self.progress_count = 0
+        self.mockup_files = {}
+
+        # announce file targets, so that all modules share a single file catalog query
+        if self.file_targets:
+            self.file_catalog_job_id = context.getJobId()
+            FileCatalog.register(self.file_catalog_job_id, self.file_targets)
 
     def process(self, dataSource, progressBar):
         self.progressBar = progressBar
@@ -196,6 +404,10 @@ class DataSourceIngestModulePlus(IngestModulePlus, DataSourceIngestModule):
     def shutDown(self):
         IngestModulePlus.shutDown(self)
 
+        if self.file_catalog_job_id is not None:
+            FileCatalog.release(self.file_catalog_job_id)
+            self.file_catalog_job_id = None
+
     def update_progress(self):
         if self.progress_count == 0:
             # now we know, how much work there will be
@@ -204,9 +416,42 @@ class DataSourceIngestModulePlus(IngestModulePlus, DataSourceIngestModule):
             self.progress_count += 1
             self.progressBar.progress(self.progress_count)
 
+    def find_files(self, dataSource, targets=None):
+        targets = targets if targets is not None else self.file_targets
+
+        # look up files in the catalog shared by all modules of the ingest job
+        try:
+            files = FileCatalog.get_instance(self.context.getJobId(), dataSource).find(targets)
+            if files is not None:
+                return files
+        except Exception as e:
+            self.log(msg="File catalog", error=e)
+
+        # query each target by file name and parent path instead of scanning all files
+        files = {}
+        for name, parent in targets:
+            if parent:
+                found = self.fileManager.findFiles(dataSource, name, parent)
+            else:
+                found = self.fileManager.findFiles(dataSource, name)
+            for file in found:
+                files[file.getId()] = file
+        return sorted(files.values(), key=lambda x: x.getUniquePath())
+
     def get_mockup_file_for_multifile_artifacts(self, dataSource):
-        # FIXME: slow
-        files = sorted(self.fileManager.findFiles(dataSource, "%"), key=lambda x: x.getUniquePath())
+        # look up the directory once per data source
+        if dataSource.getId() not in self.mockup_files:
+            self.mockup_files[dataSource.getId()] = self.__find_mockup_file(dataSource)
+        return self.mockup_files[dataSource.getId()]
+
+    def __find_mockup_file(self, dataSource):
+        # keep the first directory of all files (as FileManager.findFiles(dataSource, "%") would
+        # return them), so that duplicate check IDs of existing cases stay the same, but only
+        # fetch files that are not regular files
+        files = self.skCase.findAllFilesWhere(
+            "data_source_obj_id = {} AND LOWER(name) NOT LIKE LOWER('%journal%') AND meta_type != {}".format(
+                dataSource.getId(), TskData.TSK_FS_META_TYPE_ENUM.TSK_FS_META_TYPE_REG.getValue()))
+        files = sorted(files, key=lambda x: x.getUniquePath())
         for file in files:
             if file.isFile() is False:
                 return file
@@ -0,0 +1,329 @@
+# -*- coding: utf-8 -*-
+
+import os
+import copy
+import threading
+from collections import OrderedDict
+from java.io import File
+from org.sleuthkit.autopsy.casemodule import Case
+from org.sleuthkit.autopsy.datamodel import ContentUtils
+
+from utils.module import DIRNAME_TEMP
+
+
+class ExtractedFileCache(object):
+
+    # maximum number of bytes of extracted files kept on disk per case
+    DISK_BUDGET = 512 * 1024 * 1024
+
+    # caches per directory, and number of modules using each of them
+    _instances = {}
+    _refs = {}
+    _instances_lock = threading.Lock()
+
+    @staticmethod
+    def get_directory(case):
+        return os.path.join(case.getTempDirectory(), DIRNAME_TEMP, "extracted")
+
+    @staticmethod
+    def get_instance(case):
+        directory = ExtractedFileCache.get_directory(case)
+        with ExtractedFileCache._instances_lock:
+            if directory not in ExtractedFileCache._instances:
+                ExtractedFileCache._instances[directory] = ExtractedFileCache(directory)
+            return ExtractedFileCache._instances[directory]
+
+    @staticmethod
+    def register(case):
+        directory = ExtractedFileCache.get_directory(case)
+        with ExtractedFileCache._instances_lock:
+            ExtractedFileCache._refs[directory] = ExtractedFileCache._refs.get(directory, 0) + 1
+
+    @staticmethod
+    def unregister(case):
+        directory = ExtractedFileCache.get_directory(case)
+        with ExtractedFileCache._instances_lock:
+            if directory not in ExtractedFileCache._refs:
+                return
+            ExtractedFileCache._refs[directory] -= 1
+            if ExtractedFileCache._refs[directory] > 0:
+                return
+
+            # drop the cache, and delete its files, once the last module of the case is done
+            del ExtractedFileCache._refs[directory]
+            instance = ExtractedFileCache._instances.pop(directory, None)
+        if instance:
+            instance.clear()
+
+    @staticmethod
+    def release(path):
+        # release extracted file in whichever cache it belongs to
+        with ExtractedFileCache._instances_lock:
+            instances = list(ExtractedFileCache._instances.values())
+        for instance in instances:
+            if instance.release_path(path):
+                return True
+        return False
+
+    def __init__(self, directory, disk_budget=DISK_BUDGET):
+        self.directory = directory
+        self.disk_budget = disk_budget
+        self.hits = 0
+        self.misses = 0
+
+        self._entries = OrderedDict()   # key -> [path, size, pins], least recently used first
+        self._paths = {}                # path -> key
+        self._pending = {}              # key -> event, set when extraction is done
+        self._size = 0
+        self._lock = threading.Lock()
+
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory)
+
+    def acquire(self, file):
+        key = (file.getId(), file.getSize(), file.getMtime())
+
+        while True:
+            with self._lock:
+                # forget extracted file if it was deleted from disk in the meantime
+                if key in self._entries and self._entries[key][2] == 0 \
+                        and not os.path.exists(self._entries[key][0]):
+                    path, size, _ = self._entries.pop(key)
+                    del self._paths[path]
+                    self._size -= size
+
+                # reuse extracted file, and mark it as most recently used
+                if key in self._entries:
+                    entry = self._entries.pop(key)
+                    self._entries[key] = entry
+                    entry[2] += 1
+                    self.hits += 1
+                    return entry[0]
+
+                # extract file, unless another module is already extracting it
+                pending = self._pending.get(key)
+                if pending is None:
+                    self._pending[key] = threading.Event()
+                    self.misses += 1
+                    break
+
+            pending.wait()
+
+        path = os.path.join(self.directory, "{}_{}_{}".format(*key))
+        try:
+            ContentUtils.writeToFile(file, File(path))
+            with self._lock:
+                self._entries[key] = [path, key[1], 1]
+                self._paths[path] = key
+                self._size += key[1]
+                self.__evict()
+        finally:
+            with self._lock:
+                self._pending.pop(key).set()
+
+        return path
+
+    def release_path(self, path):
+        with self._lock:
+            if path not in self._paths:
+                return False
+            self._entries[self._paths[path]][2] -= 1
+            self.__evict()
+            return True
+
+    def get_stats(self):
+        with self._lock:
+            return "{} hits, {} misses, {} files, {} bytes".format(
+                self.hits, self.misses, len(self._entries), self._size)
+
+    def clear(self):
+        # delete all extracted files, including those still pinned
+        with self._lock:
+            for path, _, _ in self._entries.values():
+                self.__remove(path)
+            self._entries.clear()
+            self._paths.clear()
+            self._size = 0
+
+    def __evict(self):
+        # delete least recently used files that are not in use until the budget is met
+        for key in list(self._entries.keys()):
+            if self._size <= self.disk_budget:
+                break
+            path, size, pins = self._entries[key]
+            if pins > 0:
+                continue
+            del self._entries[key]
+            del self._paths[path]
+            self._size -= size
+            self.__remove(path)
+
+    def __remove(self, path):
+        for p in [path, path + "-journal", path + "-wal", path + "-shm"]:
+            try:
+                if os.path.exists(p):
+                    os.remove(p)
+            except OSError:
+                pass
+
+
+class ParsedDocumentCache(object):
+
+    # estimated number of bytes of parsed documents kept in memory per case
+    MEMORY_BUDGET = 256 * 1024 * 1024
+
+    # estimated ratio between the memory of a parsed document and its file size
+    EXPANSION_FACTOR = 10
+
+    # caches per case (temp directory), and number of modules using each of them
+    _instances = {}
+    _refs = {}
+    _instances_lock = threading.Lock()
+
+    @staticmethod
+    def get_instance(case=None):
+        directory = (case if case else Case.getCurrentCase()).getTempDirectory()
+        with ParsedDocumentCache._instances_lock:
+            if directory not in ParsedDocumentCache._instances:
+                ParsedDocumentCache._instances[directory] = ParsedDocumentCache()
+            return ParsedDocumentCache._instances[directory]
+
+    @staticmethod
+    def register(case):
+        directory = case.getTempDirectory()
+        with ParsedDocumentCache._instances_lock:
+            ParsedDocumentCache._refs[directory] = ParsedDocumentCache._refs.get(directory, 0) + 1
+
+    @staticmethod
+    def unregister(case):
+        directory = case.getTempDirectory()
+        with ParsedDocumentCache._instances_lock:
+            if directory not in ParsedDocumentCache._refs:
+                return
+            ParsedDocumentCache._refs[directory] -= 1
+            if ParsedDocumentCache._refs[directory] > 0:
+                return
+
+            # drop the cache once the last module of the case is done
+            del ParsedDocumentCache._refs[directory]
+            instance = ParsedDocumentCache._instances.pop(directory, None)
+        if instance:
+            instance.clear()
+
+    @staticmethod
+    def freeze(data):
+        # convert parsed document into a read-only structure that can be shared among modules
+        if isinstance(data, OrderedDict):
+            return ReadOnlyOrderedDict(
+                (k, ParsedDocumentCache.freeze(v)) for k, v in data.items())
+        if isinstance(data, dict):
+            return ReadOnlyDict(
+                (k, ParsedDocumentCache.freeze(v)) for k, v in data.items())
+        if isinstance(data, list):
+            return tuple(ParsedDocumentCache.freeze(v) for v in data)
+        return data
+
+    def __init__(self, memory_budget=MEMORY_BUDGET):
+        self.memory_budget = memory_budget
+        self.hits = 0
+        self.misses = 0
+
+        self._entries = OrderedDict()   # key -> [document, size], least recently used first
+        self._pending = {}              # key -> event, set when parsing is done
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, file, kind, parse, options=(), copy_on_get=False):
+        key = (file.getId(), file.getSize(), file.getMtime(), kind, options)
+
+        while True:
+            with self._lock:
+                # reuse parsed document, and mark it as most recently used
+                if key in self._entries:
+                    entry = self._entries.pop(key)
+                    self._entries[key] = entry
+                    self.hits += 1
+                    return copy.deepcopy(entry[0]) if copy_on_get else entry[0]
+
+                # parse document, unless another module is already parsing it
+                pending = self._pending.get(key)
+                if pending is None:
+                    self._pending[key] = threading.Event()
+                    self.misses += 1
+                    break
+
+            pending.wait()
+
+        try:
+            document = parse()
+            if not copy_on_get:
+                document = ParsedDocumentCache.freeze(document)
+            with self._lock:
+                self._entries[key] = [document, max(1, key[1]) * self.EXPANSION_FACTOR]
+                self._size += self._entries[key][1]
+                self.__evict()
+        finally:
+            with self._lock:
+                self._pending.pop(key).set()
+
+        return copy.deepcopy(document) if copy_on_get else document
+
+    def get_stats(self):
+        with self._lock:
+            return "{} hits, {} misses, {} documents, ~{} bytes".format(
+                self.hits, self.misses, len(self._entries), self._size)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def __evict(self):
+        # drop least recently used documents until the budget is met
+        while self._size > self.memory_budget and self._entries:
+            _, entry = self._entries.popitem(last=False)
+            self._size -= entry[1]
+
+
+class ReadOnlyDict(dict):
+
+    def __init__(self, *args, **kwargs):
+        self._frozen = False
+        dict.__init__(self, *args, **kwargs)
+        self._frozen = True
+
+    def __readonly(self, *args, **kwargs):
+        raise TypeError("{} is read-only".format(self.__class__.__name__))
+
+    def __setitem__(self, key, value):
+        if getattr(self, "_frozen", False):
+            self.__readonly()
+        dict.__setitem__(self, key, value)
+
+    def __reduce__(self):
+        # copies are regular, mutable dictionaries
+        return (dict, (list(self.items()),))
+
+    __delitem__ = clear = pop = popitem = setdefault = update = __readonly
+
+
+class ReadOnlyOrderedDict(OrderedDict):
+
+    def __init__(self, *args, **kwargs):
+        self._frozen = False
+        OrderedDict.__init__(self, *args, **kwargs)
+        self._frozen = True
+
+    def __readonly(self, *args, **kwargs):
+        raise TypeError("{} is read-only".format(self.__class__.__name__))
+
+    def __setitem__(self, key, value, *args):
+        if getattr(self, "_frozen", False):
+            self.__readonly()
+        OrderedDict.__setitem__(self, key, value, *args)
+
+    def __reduce__(self):
+        # copies are regular, mutable ordered dictionaries
+        return (OrderedDict, (list(self.items()),))
+
+    __delitem__ = clear = pop = popitem = setdefault = update = __readonly
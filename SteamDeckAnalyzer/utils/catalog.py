@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+
+import re
+import threading
+from org.sleuthkit.autopsy.casemodule import Case
+
+
+class FileCatalog(object):
+
+    # file targets registered by the modules of each ingest job
+    _targets = {}
+    _refs = {}
+    _catalogs = {}
+    _lock = threading.Lock()
+
+    @staticmethod
+    def register(job_id, targets):
+        with FileCatalog._lock:
+            FileCatalog._targets.setdefault(job_id, set()).update(targets)
+            FileCatalog._refs[job_id] = FileCatalog._refs.get(job_id, 0) + 1
+
+    @staticmethod
+    def release(job_id):
+        with FileCatalog._lock:
+            if job_id not in FileCatalog._refs:
+                return
+            FileCatalog._refs[job_id] -= 1
+            if FileCatalog._refs[job_id] > 0:
+                return
+
+            # drop catalogs once the last module of the ingest job is done
+            del FileCatalog._refs[job_id]
+            del FileCatalog._targets[job_id]
+            for key in [key for key in FileCatalog._catalogs if key[0] == job_id]:
+                del FileCatalog._catalogs[key]
+
+    @staticmethod
+    def get_instance(job_id, dataSource):
+        key = (job_id, dataSource.getId())
+        with FileCatalog._lock:
+            if key not in FileCatalog._catalogs:
+                FileCatalog._catalogs[key] = FileCatalog(
+                    dataSource, FileCatalog._targets.get(job_id, set()))
+            return FileCatalog._catalogs[key]
+
+    @staticmethod
+    def like_to_regex(pattern):
+        # translate SQL LIKE wildcards, matching case-insensitively like the case database
+        regex = "".join(
+            ".*" if c == "%" else "." if c == "_" else re.escape(c) for c in pattern)
+        return re.compile("{}\\Z".format(regex), re.I | re.S)
+
+    @staticmethod
+    def get_extension(name):
+        return name.rsplit(".", 1)[1].lower() if "." in name else ""
+
+    def __init__(self, dataSource, targets):
+        self.dataSource = dataSource
+        self.targets = frozenset(targets)
+        self.loaded = False
+
+        self._files = []
+        self._by_name = {}
+        self._by_extension = {}
+        self._lock = threading.Lock()
+
+    def covers(self, targets):
+        return all(target in self.targets for target in targets)
+
+    def find(self, targets):
+        # only answer for targets that were part of the catalog query
+        if not self.covers(targets):
+            return None
+        self.__load()
+
+        files = {}
+        for name, parent in targets:
+            regex_parent = FileCatalog.like_to_regex("%{}%".format(parent)) if parent else None
+            for file in self.__candidates(name):
+                if regex_parent and not regex_parent.match(file.getParentPath() or ""):
+                    continue
+                files[file.getId()] = file
+        return sorted(files.values(), key=lambda x: x.getUniquePath())
+
+    def __candidates(self, name):
+        # exact names and extensions are looked up, other patterns are matched
+        if not any(c in name for c in "%_"):
+            return self._by_name.get(name.lower(), [])
+        if name.startswith("%.") and not any(c in name[2:] for c in "%_."):
+            return self._by_extension.get(name[2:].lower(), [])
+        regex = FileCatalog.like_to_regex(name)
+        return [file for file in self._files if regex.match(file.getName())]
+
+    def __load(self):
+        with self._lock:
+            if self.loaded:
+                return
+
+            # fetch files of all targets with a single query (same filter as FileManager.findFiles)
+            conditions = []
+            for name, parent in sorted(self.targets):
+                condition = "LOWER(name) LIKE LOWER('{}')".format(name.replace("'", "''"))
+                if parent:
+                    condition += " AND LOWER(parent_path) LIKE LOWER('%{}%')".format(
+                        parent.replace("'", "''"))
+                conditions.append("({})".format(condition))
+
+            if conditions:
+                self._files = list(Case.getCurrentCase().getSleuthkitCase().findAllFilesWhere(
+                    "data_source_obj_id = {} AND LOWER(name) NOT LIKE LOWER('%journal%') AND ({})".format(
+                        self.dataSource.getId(), " OR ".join(conditions))))
+
+            # index files by name and extension
+            for file in self._files:
+                name = file.getName()
+                self._by_name.setdefault(name.lower(), []).append(file)
+                self._by_extension.setdefault(FileCatalog.get_extension(name), []).append(file)
+
+            self.loaded = True
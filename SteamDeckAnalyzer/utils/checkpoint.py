@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+
+import os
+import json
+import threading
+
+from utils.module import DIRNAME_MODULE
+
+
+class CheckpointStore(object):
+
+    _lock = threading.Lock()
+
+    @staticmethod
+    def get_path(case, name):
+        return os.path.join(case.getModuleDirectory(), DIRNAME_MODULE, "{}.json".format(name))
+
+    def __init__(self, path):
+        self.path = path
+        self.records = {}
+        self.load()
+
+    def load(self):
+        # start over if there is no checkpoint yet, or if it cannot be read
+        self.records = {}
+        with CheckpointStore._lock:
+            if not os.path.isfile(self.path):
+                return
+            try:
+                with open(self.path, "r") as fh:
+                    self.records = json.load(fh)
+            except (IOError, ValueError):
+                self.records = {}
+
+    def save(self):
+        # write to a temporary file first, so that a crash leaves the previous checkpoint intact
+        with CheckpointStore._lock:
+            directory = os.path.dirname(self.path)
+            if not os.path.exists(directory):
+                os.makedirs(directory)
+            path_tmp = "{}.tmp".format(self.path)
+            with open(path_tmp, "w") as fh:
+                json.dump(self.records, fh, indent=1, sort_keys=True)
+            if os.path.exists(self.path):
+                os.remove(self.path)
+            os.rename(path_tmp, self.path)
+
+    def get(self, obj_id):
+        return self.records.get(str(obj_id))
+
+    def set(self, obj_id, record):
+        self.records[str(obj_id)] = record
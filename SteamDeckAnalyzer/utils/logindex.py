@@ -0,0 +1,311 @@
+# -*- coding: utf-8 -*-
+
+import os
+import re
+
+try:
+    # Jython: write and query the index via Autopsy's SQLite JDBC driver
+    from java.lang import Class
+    from java.lang import String
+    from java.sql import DriverManager
+    sqlite3 = None
+except ImportError:
+    # CPython: query an existing index outside of Autopsy (see dev/query_log_index.py)
+    import sqlite3
+
+from utils.module import DIRNAME_MODULE
+
+
+class LogEntryIndex(object):
+
+    # number of log entries inserted per batch
+    BATCH_SIZE = 10000
+
+    # number of entry IDs kept in memory before posting lists are written to disk
+    POSTINGS_LIMIT = 2000000
+
+    # IPv4 addresses, hexadecimal codes, as well as words and numbers (e.g., app IDs, Steam IDs)
+    PATTERN_TOKEN = re.compile(r"\d{1,3}(?:\.\d{1,3}){3}|0x[0-9a-f]+|[a-z0-9_]+", re.I)
+
+    SCHEMA = [
+        "CREATE TABLE IF NOT EXISTS sources ("
+        " id INTEGER PRIMARY KEY,"
+        " obj_id INTEGER NOT NULL UNIQUE,"
+        " path TEXT NOT NULL)",
+        "CREATE TABLE IF NOT EXISTS entries ("
+        " id INTEGER PRIMARY KEY,"
+        " ts TEXT,"
+        " source_id INTEGER NOT NULL REFERENCES sources(id),"
+        " entry_no INTEGER NOT NULL,"
+        " msg TEXT NOT NULL,"
+        " ts_last TEXT,"
+        " repeat_count INTEGER NOT NULL DEFAULT 1,"
+        " UNIQUE (source_id, entry_no))",
+        "CREATE INDEX IF NOT EXISTS entries_ts ON entries (ts)",
+        "CREATE TABLE IF NOT EXISTS postings ("
+        " token TEXT NOT NULL,"
+        " first_id INTEGER NOT NULL,"
+        " data BLOB NOT NULL,"
+        " PRIMARY KEY (token, first_id))",
+    ]
+
+    @staticmethod
+    def tokenize(text):
+        tokens = set()
+        for token in LogEntryIndex.PATTERN_TOKEN.findall(text):
+            if len(token) > 1 or token.isdigit():
+                tokens.add(token.lower())
+        return tokens
+
+    @staticmethod
+    def encode_postings(ids):
+        # sorted entry IDs as deltas, each encoded as varint
+        data = []
+        prev = 0
+        for i in ids:
+            delta = i - prev
+            prev = i
+            while delta >= 0x80:
+                data.append(chr(delta & 0x7f | 0x80))
+                delta >>= 7
+            data.append(chr(delta))
+        return "".join(data)
+
+    @staticmethod
+    def decode_postings(data):
+        ids = []
+        prev = 0
+        delta = 0
+        shift = 0
+        for c in data:
+            b = ord(c)
+            delta |= (b & 0x7f) << shift
+            if b & 0x80:
+                shift += 7
+                continue
+            prev += delta
+            ids.append(prev)
+            delta = 0
+            shift = 0
+        return ids
+
+    @staticmethod
+    def get_path(case):
+        return os.path.join(case.getModuleDirectory(), DIRNAME_MODULE, "log_entries.db")
+
+    def __init__(self, path):
+        self.path = path
+        self.dbConn = None
+        self.stmt_insert = None
+        self.sources = {}
+        self.pending = 0
+
+        # posting lists of entries not yet written to disk
+        self.postings = {}
+        self.postings_count = 0
+        self.last_tokenized_id = 0
+
+    def open(self):
+        if sqlite3:
+            if not os.path.isfile(self.path):
+                raise IOError("No index of log entries: {}".format(self.path))
+            self.dbConn = sqlite3.connect(self.path)
+            return self
+
+        directory = os.path.dirname(self.path)
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+
+        Class.forName("org.sqlite.JDBC").newInstance()
+        self.dbConn = DriverManager.getConnection("jdbc:sqlite:{}".format(self.path))
+        stmt = self.dbConn.createStatement()
+        for sql in self.SCHEMA:
+            stmt.execute(sql)
+
+        # entries of previous runs are already tokenized
+        results = stmt.executeQuery("SELECT COALESCE(MAX(id), 0) AS max_id FROM entries")
+        results.next()
+        self.last_tokenized_id = results.getLong("max_id")
+        results.close()
+        stmt.close()
+
+        self.dbConn.setAutoCommit(False)
+        return self
+
+    def close(self):
+        if not self.dbConn:
+            return
+        if sqlite3:
+            self.dbConn.close()
+            self.dbConn = None
+            return
+        try:
+            self.flush(write_postings=True)
+        finally:
+            if self.stmt_insert:
+                self.stmt_insert.close()
+                self.stmt_insert = None
+            self.dbConn.close()
+            self.dbConn = None
+
+    def flush(self, write_postings=False):
+        if self.pending:
+            self.stmt_insert.executeBatch()
+            self.pending = 0
+
+        # tokenize inserted entries, and write posting lists in segments
+        self.__tokenize_new_entries()
+        if write_postings or self.postings_count >= self.POSTINGS_LIMIT:
+            self.__write_postings()
+
+        self.dbConn.commit()
+
+    def __tokenize_new_entries(self):
+        # entries ignored as duplicates are not read back, and thus not tokenized twice
+        stmt = self.dbConn.prepareStatement("SELECT id, msg FROM entries WHERE id > ? ORDER BY id")
+        stmt.setLong(1, self.last_tokenized_id)
+        results = stmt.executeQuery()
+        while results.next():
+            entry_id = results.getLong("id")
+            for token in LogEntryIndex.tokenize(results.getString("msg")):
+                self.postings.setdefault(token, []).append(entry_id)
+                self.postings_count += 1
+            self.last_tokenized_id = entry_id
+        results.close()
+        stmt.close()
+
+    def __write_postings(self):
+        if not self.postings:
+            return
+        stmt = self.dbConn.prepareStatement(
+            "INSERT OR REPLACE INTO postings (token, first_id, data) VALUES (?, ?, ?)")
+        for token, ids in self.postings.items():
+            stmt.setString(1, token)
+            stmt.setLong(2, ids[0])
+            stmt.setBytes(3, String(LogEntryIndex.encode_postings(ids)).getBytes("ISO-8859-1"))
+            stmt.addBatch()
+        stmt.executeBatch()
+        stmt.close()
+        self.postings = {}
+        self.postings_count = 0
+
+    def add_source(self, obj_id, path):
+        if obj_id in self.sources:
+            return self.sources[obj_id]
+
+        stmt = self.dbConn.prepareStatement("INSERT OR IGNORE INTO sources (obj_id, path) VALUES (?, ?)")
+        stmt.setLong(1, obj_id)
+        stmt.setString(2, path)
+        stmt.executeUpdate()
+        stmt.close()
+
+        stmt = self.dbConn.prepareStatement("SELECT id FROM sources WHERE obj_id = ?")
+        stmt.setLong(1, obj_id)
+        results = stmt.executeQuery()
+        results.next()
+        self.sources[obj_id] = results.getLong("id")
+        results.close()
+        stmt.close()
+        return self.sources[obj_id]
+
+    def add(self, source_id, entry_no, ts, msg, ts_last=None, repeat_count=1):
+        # entries that were indexed by a previous run keep their row
+        if not self.stmt_insert:
+            self.stmt_insert = self.dbConn.prepareStatement(
+                "INSERT OR IGNORE INTO entries (ts, source_id, entry_no, msg, ts_last, repeat_count) "
+                "VALUES (?, ?, ?, ?, ?, ?)")
+        self.stmt_insert.setString(1, ts)
+        self.stmt_insert.setLong(2, source_id)
+        self.stmt_insert.setLong(3, entry_no)
+        self.stmt_insert.setString(4, msg)
+        self.stmt_insert.setString(5, ts_last)
+        self.stmt_insert.setLong(6, repeat_count)
+        self.stmt_insert.addBatch()
+
+        self.pending += 1
+        if self.pending >= self.BATCH_SIZE:
+            self.flush()
+
+    def query(self, start=None, end=None, paths=None, limit=None):
+        # return (timestamp, path, entry number, message) within [start, end] ordered by time,
+        # with timestamps given as "YYYY-MM-DD HH:MM:SS" (or a prefix like "YYYY-MM-DD HH:MM")
+        conditions = ["e.ts IS NOT NULL"]
+        params = []
+        if start:
+            conditions.append("e.ts >= ?")
+            params.append(start)
+        if end:
+            # an end prefix includes all timestamps it covers
+            conditions.append("e.ts <= ?")
+            params.append(end + "~" if len(end) < 19 else end)
+        if paths:
+            conditions.append("s.path IN ({})".format(", ".join("?" for _ in paths)))
+            params.extend(paths)
+
+        sql = "SELECT e.ts, s.path, e.entry_no, e.msg FROM entries AS e " \
+            "JOIN sources AS s ON s.id = e.source_id WHERE {} " \
+            "ORDER BY e.ts, s.path, e.entry_no".format(" AND ".join(conditions))
+        if limit:
+            sql += " LIMIT {}".format(int(limit))
+        if sqlite3:
+            return [tuple(row) for row in self.dbConn.execute(sql, params)]
+
+        entries = []
+        stmt = self.dbConn.prepareStatement(sql)
+        try:
+            for i, param in enumerate(params):
+                stmt.setString(i + 1, param)
+            results = stmt.executeQuery()
+            while results.next():
+                entries.append((results.getString("ts"), results.getString("path"),
+                                results.getLong("entry_no"), results.getString("msg")))
+            results.close()
+        finally:
+            stmt.close()
+        return entries
+
+    def search(self, text):
+        # return IDs of entries containing all tokens of the text
+        ids = None
+        sql = "SELECT data FROM postings WHERE token = ? ORDER BY first_id"
+        for token in sorted(LogEntryIndex.tokenize(text)):
+            token_ids = set()
+            if sqlite3:
+                for row in self.dbConn.execute(sql, (token,)):
+                    token_ids.update(LogEntryIndex.decode_postings(str(row[0])))
+            else:
+                stmt = self.dbConn.prepareStatement(sql)
+                stmt.setString(1, token)
+                results = stmt.executeQuery()
+                while results.next():
+                    token_ids.update(LogEntryIndex.decode_postings(results.getBytes("data").tostring()))
+                results.close()
+                stmt.close()
+
+            ids = token_ids if ids is None else ids & token_ids
+            if not ids:
+                return []
+        return sorted(ids) if ids else []
+
+    def get_entries(self, ids):
+        # return (timestamp, path, entry number, message) of the given entry IDs
+        entries = []
+        ids = list(ids)
+        for i in range(0, len(ids), 500):
+            chunk = ids[i:i + 500]
+            sql = "SELECT e.ts, s.path, e.entry_no, e.msg FROM entries AS e " \
+                "JOIN sources AS s ON s.id = e.source_id WHERE e.id IN ({}) " \
+                "ORDER BY e.id".format(", ".join("?" for _ in chunk))
+            if sqlite3:
+                entries.extend(tuple(row) for row in self.dbConn.execute(sql, chunk))
+                continue
+            stmt = self.dbConn.prepareStatement(sql)
+            for k, entry_id in enumerate(chunk):
+                stmt.setLong(k + 1, entry_id)
+            results = stmt.executeQuery()
+            while results.next():
+                entries.append((results.getString("ts"), results.getString("path"),
+                                results.getLong("entry_no"), results.getString("msg")))
+            results.close()
+            stmt.close()
+        return entries
@@ -26,3 +26,15 @@ MODULE_USERS = "{}Users".format(PREFIX_MODULE)
 MODULE_WEB_COOKIES = "{}Web: Cookies".format(PREFIX_MODULE)
 MODULE_WEB_QUOTAMANAGER = "{}Web: QuotaManager".format(PREFIX_MODULE)
 MODULE_WIFI = "{}Wi-Fi".format(PREFIX_MODULE)
+
+####################
+#  TEMP DIRECTORY  #
+####################
+
+DIRNAME_TEMP = "SteamDeckAnalyzer"
+
+######################
+#  MODULE DIRECTORY  #
+######################
+
+DIRNAME_MODULE = "SteamDeckAnalyzer"
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+
+import os
+import heapq
+import marshal
+import tempfile
+
+
+class ExternalSorter(object):
+
+    # estimated number of bytes of sortable items kept in memory before spilling a run to disk
+    MEMORY_LIMIT = 64 * 1024 * 1024
+
+    # estimated number of bytes per item in addition to the length of its strings
+    ITEM_OVERHEAD = 256
+
+    # number of items written and read at once
+    BATCH_SIZE = 1024
+
+    def __init__(self, directory, memory_limit=MEMORY_LIMIT):
+        self.directory = directory
+        self.memory_limit = memory_limit
+        self.runs = []
+
+    def sort(self, items):
+        # sort items (tuples of strings, numbers, and None) that may not fit into memory
+        try:
+            pending = []
+            size = 0
+            for item in items:
+                pending.append(item)
+                size += self.__estimate_size(item)
+                if size >= self.memory_limit:
+                    self.__spill(pending)
+                    pending = []
+                    size = 0
+
+            # sort in memory, unless runs were already spilled
+            if not self.runs:
+                for item in sorted(pending):
+                    yield item
+                return
+
+            # merge sorted runs back from disk
+            if pending:
+                self.__spill(pending)
+                pending = None
+            for item in heapq.merge(*[self.__read_run(path) for path in self.runs]):
+                yield item
+
+        finally:
+            self.close()
+
+    def close(self):
+        for path in self.runs:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        self.runs = []
+
+    def __estimate_size(self, item):
+        return self.ITEM_OVERHEAD + sum(len(v) for v in item if isinstance(v, basestring))
+
+    def __spill(self, pending):
+        # write sorted run in batches of items
+        if not os.path.exists(self.directory):
+            try:
+                os.makedirs(self.directory)
+            except OSError:
+                pass
+        fd, path = tempfile.mkstemp(prefix="run-", suffix=".bin", dir=self.directory)
+        self.runs.append(path)
+
+        pending.sort()
+        with os.fdopen(fd, "wb") as fh:
+            for i in range(0, len(pending), self.BATCH_SIZE):
+                marshal.dump(pending[i:i + self.BATCH_SIZE], fh)
+
+    def __read_run(self, path):
+        with open(path, "rb") as fh:
+            while True:
+                try:
+                    batch = marshal.load(fh)
+                except EOFError:
+                    return
+                for item in batch:
+                    yield item
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+
+import re
+
+
+class SteamLogParser(object):
+
+    PATTERN_ENTRY = re.compile(r"^\[(\d{4}-\d{2}-\d{2}\s+\d{2}:\d{2}:\d{2})\]\s+(.*)$")
+    PATTERN_TS = re.compile(r"^\[(\d{4}-\d{2}-\d{2}\s+\d{2}:\d{2}:\d{2})\]")
+
+    # characters matched by `\s`, and stripped by `str.strip()`
+    WHITESPACE = " \t\n\r\x0b\x0c"
+
+    @staticmethod
+    def split(l):
+        # split a stripped line into (timestamp, message);
+        # message is None for a timestamp without message, both are None without timestamp
+        if l[:1] != "[":
+            return None, None
+
+        # fast path: `[YYYY-MM-DD HH:MM:SS]` checked by position,
+        # i.e., separators at their offsets and digits everywhere else
+        if l[20:21] == "]" \
+            and l[5] == "-" and l[8] == "-" and l[11] == " " and l[14] == ":" and l[17] == ":" \
+            and l[1:20].translate(None, "0123456789") == "-- ::":
+            c = l[21:22]
+            if c and c in SteamLogParser.WHITESPACE:
+                return l[1:20], l[22:].lstrip()
+            return l[1:20], None
+
+        # slow path: other whitespace between date and time
+        m = SteamLogParser.PATTERN_ENTRY.match(l)
+        if m:
+            return m.group(1).strip(), m.group(2).strip()
+        m = SteamLogParser.PATTERN_TS.match(l)
+        if m:
+            return m.group(1).strip(), None
+        return None, None
+
+    def __init__(self, path, continued=False, index=0, prev_ts=None):
+        self.path = path
+        self.continued = continued
+
+        # parser state after the last complete line
+        self.index = index
+        self.prev_ts = prev_ts
+
+    def parse(self, lines):
+        # yield log entries as (timestamp, path, index, message); in continued mode,
+        # lines without timestamp continue the entry with the previous timestamp
+        split = SteamLogParser.split
+        path = self.path
+        continued = self.continued
+        index = index_complete = self.index
+        prev_ts = prev_ts_complete = self.prev_ts
+
+        line = "\n"
+        for line in lines:
+            index_complete, prev_ts_complete = index, prev_ts
+
+            l = line.strip()
+            if not l:
+                continue
+
+            ts, msg = split(l) if l[0] == "[" else (None, None)
+            if ts is None:
+                if continued:
+                    yield (prev_ts, path, index, l)
+                    index += 1
+                continue
+
+            if continued:
+                prev_ts = ts
+            if msg is not None:
+                yield (ts, path, index, msg)
+                index += 1
+
+        # keep state without an incomplete last line that may still grow
+        if line.endswith("\n"):
+            self.index, self.prev_ts = index, prev_ts
+        else:
+            self.index, self.prev_ts = index_complete, prev_ts_complete
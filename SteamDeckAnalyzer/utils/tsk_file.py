@@ -1,26 +1,64 @@
 # -*- coding: utf-8 -*-
 
-import os
 import re
 import jarray
-import tempfile
 import hashlib
+import threading
 import ConfigParser
+from collections import OrderedDict
 import xml.etree.ElementTree as ET
-from java.io import File
 from java.lang import Class
 from java.sql import DriverManager
 from org.sleuthkit.datamodel import TskData
-from org.sleuthkit.autopsy.datamodel import ContentUtils
 
 from utils.artifact import ArtifactUtils
+from utils.cache import ExtractedFileCache, ParsedDocumentCache
 from utils.timestamp import TimestampUtils
 from utils.thirdparty import vdf
-from utils.thirdparty.vdfutils.vdfutils import parse_vdf as vdfutils_parse_vdf
+from utils.thirdparty.vdfutils.vdfutils import VDFConsistencyError
+from utils.vdf_reader import VDFReader
+from utils.vdf_tree import VDFNode
 
 
 class TSKFileUtils:
 
+    FILE_INFO_GETTERS = [
+        (ArtifactUtils.ATTR_FILE_PATH, lambda f: f.getUniquePath()),
+        (ArtifactUtils.ATTR_FILE_PATH_LOCAL, lambda f: f.getLocalPath()),
+        (ArtifactUtils.ATTR_FILE_PATH_LOCAL_ABSOLUTE, lambda f: f.getLocalAbsPath()),
+        (ArtifactUtils.ATTR_FILE_PATH_PARENT, lambda f: f.getParentPath()),
+        (ArtifactUtils.ATTR_FILE_NAME, lambda f: f.getName()),
+        (ArtifactUtils.ATTR_FILE_EXTENSION, lambda f: f.getNameExtension()),
+        (ArtifactUtils.ATTR_FILE_SIZE, lambda f: f.getSize()),
+        (ArtifactUtils.ATTR_FILE_TYPE, lambda f: f.getType()),
+        (ArtifactUtils.ATTR_FILE_TYPE_MIME, lambda f: f.getMIMEType()),
+        (ArtifactUtils.ATTR_FILE_TYPE_META, lambda f: f.getMetaTypeAsString()),
+        (ArtifactUtils.ATTR_HASH_SHA256, lambda f: f.getSha256Hash()),
+        (ArtifactUtils.ATTR_HASH_SHA1, lambda f: f.getSha1Hash()),
+        (ArtifactUtils.ATTR_HASH_MD5, lambda f: f.getMd5Hash()),
+        (ArtifactUtils.ATTR_EXISTS, lambda f: f.exists()),
+        (ArtifactUtils.ATTR_IS_FILE, lambda f: f.isFile()),
+        (ArtifactUtils.ATTR_IS_DIR, lambda f: f.isDir()),
+        (ArtifactUtils.ATTR_IS_ROOT, lambda f: f.isRoot()),
+        (ArtifactUtils.ATTR_IS_VIRTUAL, lambda f: f.isVirtual()),
+        (ArtifactUtils.ATTR_HAS_FILESYSTEM, lambda f: f.hasFileSystem()),
+        (ArtifactUtils.ATTR_TIME_A, lambda f: f.getAtime()),
+        (ArtifactUtils.ATTR_TIME_M, lambda f: f.getMtime()),
+        (ArtifactUtils.ATTR_TIME_CR, lambda f: f.getCrtime()),
+        (ArtifactUtils.ATTR_TIME_C, lambda f: f.getCtime()),
+        (ArtifactUtils.ATTR_DATE_A, lambda f: f.getAtimeAsDate()),
+        (ArtifactUtils.ATTR_DATE_M, lambda f: f.getMtimeAsDate()),
+        (ArtifactUtils.ATTR_DATE_CR, lambda f: f.getCrtimeAsDate()),
+        (ArtifactUtils.ATTR_DATE_C, lambda f: f.getCtimeAsDate()),
+    ]
+
+    # names of VDF files per parser that handled them, shared by all modules
+    _vdf_parsers = OrderedDict()
+    _vdf_parsers_lock = threading.Lock()
+
+    # number of file names per parser shown in statistics
+    VDF_STATS_NAMES = 5
+
     @staticmethod
     def is_slack_file(file):
         return file.getType() == TskData.TSK_DB_FILES_TYPE_ENUM.SLACK
@@ -48,9 +86,8 @@ class TSKFileUtils:
     @staticmethod
     def open_file(file, case=None, return_path=False):
         if case:
-            # write contents from TSK File object to temporary file
-            filepath = os.path.join(case.getTempDirectory(), "{}.db".format(file.getId()))
-            ContentUtils.writeToFile(file, File(filepath))
+            # extract contents from TSK File object once per case, shared by all modules
+            filepath = ExtractedFileCache.get_instance(case).acquire(file)
             fh = open(filepath, "rb")
             fh.seek(0)
 
@@ -58,14 +95,8 @@ class TSKFileUtils:
                 return fh, filepath
 
         else:
-            # read contents from TSK File object into jarray buffer
-            buffer = jarray.zeros(file.getSize(), "b")
-            file.read(buffer, 0, file.getSize())
-
-            # write contents from buffer into temporary file
-            fh = tempfile.NamedTemporaryFile(delete=False)
-            fh.write(buffer)
-            fh.seek(0)
+            # read contents from TSK File object on demand
+            fh = TSKFileReader(file)
 
         return fh
 
@@ -74,7 +105,7 @@ class TSKFileUtils:
         if fh:
             fh.close()
             if hasattr(fh, "name"):
-                os.remove(fh.name)
+                ExtractedFileCache.release(fh.name)
 
     @staticmethod
     def open_sqlite_file(file, case):
@@ -91,34 +122,92 @@ class TSKFileUtils:
 
     @staticmethod
     def parse_xml_file(file, case=None):
+        # parse once per case, and hand out a copy of the tree to each module
+        return ParsedDocumentCache.get_instance(case).get(
+            file, "xml", lambda: TSKFileUtils.__parse_xml_file(file, case), copy_on_get=True)
+
+    @staticmethod
+    def __parse_xml_file(file, case=None):
         fh = TSKFileUtils.open_file(file, case=case)
         tree = ET.fromstring(fh.read())
         TSKFileUtils.close_file(fh)
         return tree
 
     @staticmethod
-    def parse_vdf_file(file, case=None):
+    def parse_vdf_file(file, case=None, paths=None, compact=False):
+        # parse once per case, and share a read-only dictionary among modules;
+        # with key paths, only the subtrees at these paths are parsed;
+        # compact documents are shared as `VDFNode` trees with a dict-like read API
+        options = tuple(sorted(set(tuple(path) for path in paths))) if paths is not None else ()
+        if compact:
+            return ParsedDocumentCache.get_instance(case).get(
+                file, "vdf", lambda: VDFNode.from_dict(TSKFileUtils.__parse_vdf_file(file, case, paths)),
+                options=options + ("compact",))
+        return ParsedDocumentCache.get_instance(case).get(
+            file, "vdf", lambda: TSKFileUtils.__parse_vdf_file(file, case, paths), options=options)
+
+    @staticmethod
+    def __parse_vdf_file(file, case=None, paths=None):
         fh = None
-        data = {}
         
         try:
             fh = TSKFileUtils.open_file(file, case=case)
-            try:
-                data = vdfutils_parse_vdf(fh.read())
-            except:
-                try:
-                    data = vdf.loads(fh.read())
-                finally:
-                    pass
+            content = fh.read()
 
         finally:
             if fh:
                 TSKFileUtils.close_file(fh)
-                        
-        return data
+
+        # tell the format by the first bytes, and hand the content to a single parser
+        fmt, content = VDFReader.sniff(content)
+        if fmt == VDFReader.FORMAT_BINARY:
+            data = vdf.binary_loads(content, mapper=OrderedDict)
+            TSKFileUtils.__count_vdf_parser("vdf.binary_loads", file)
+        elif fmt == VDFReader.FORMAT_TEXT_CR:
+            data = vdf.loads(content, mapper=OrderedDict)
+            TSKFileUtils.__count_vdf_parser("vdf.loads", file)
+
+        else:
+            try:
+                if paths is not None:
+                    data = VDFReader.extract(content, paths)
+                    TSKFileUtils.__count_vdf_parser("VDFReader.extract", file)
+                    return data
+                data = VDFReader.parse(content)
+                TSKFileUtils.__count_vdf_parser("VDFReader", file)
+                return data
+            except VDFConsistencyError:
+                # e.g., conditionals or other syntax that only vdf understands
+                data = vdf.loads(content, mapper=OrderedDict)
+                TSKFileUtils.__count_vdf_parser("vdf.loads (fallback)", file)
+
+        return VDFReader.select(data, paths) if paths is not None else data
+
+    @staticmethod
+    def __count_vdf_parser(parser, file):
+        with TSKFileUtils._vdf_parsers_lock:
+            TSKFileUtils._vdf_parsers.setdefault(parser, []).append(file.getName())
+
+    @staticmethod
+    def get_vdf_parser_stats():
+        with TSKFileUtils._vdf_parsers_lock:
+            stats = []
+            for parser, names in TSKFileUtils._vdf_parsers.items():
+                names_shown = ", ".join(names[:TSKFileUtils.VDF_STATS_NAMES])
+                if len(names) > TSKFileUtils.VDF_STATS_NAMES:
+                    names_shown += ", ..."
+                stats.append("{} {} ({})".format(parser, len(names), names_shown))
+            return "; ".join(stats) or "no files"
 
     @staticmethod
     def parse_config_file(file, lowercase=True):
+        # parse once per case, and share a read-only dictionary among modules
+        return ParsedDocumentCache.get_instance().get(
+            file, "config", lambda: TSKFileUtils.__parse_config_file(file, lowercase),
+            options=(lowercase,))
+
+    @staticmethod
+    def __parse_config_file(file, lowercase=True):
         # read config file
         fh = TSKFileUtils.open_file(file)
         config = ConfigParser.RawConfigParser(allow_no_value=True)
@@ -138,7 +227,7 @@ class TSKFileUtils:
 
         # parse boot config file
         config = {}
-        for line in fh.readlines():
+        for line in fh:
             if line.strip() == "":
                 continue
             m = re.match(r'([^:]*):\s+(.*)\n', line)
@@ -178,121 +267,120 @@ class TSKFileUtils:
         return dict(items)
 
     @staticmethod
-    def get_file_info(file):
+    def get_file_info(file, attributes=None):
+        # collect all file information, or only the requested attributes
         info = {}
+        for attr, getter in TSKFileUtils.FILE_INFO_GETTERS:
+            if attributes is not None and attr not in attributes:
+                continue
+            try:
+                info[attr] = str(getter(file))
+            except:
+                info[attr] = ""
+        return info
 
-        try:
-            info[ArtifactUtils.ATTR_FILE_PATH] = str(file.getUniquePath())
-        except:
-            info[ArtifactUtils.ATTR_FILE_PATH] = ""
-        try:
-            info[ArtifactUtils.ATTR_FILE_PATH_LOCAL] = str(file.getLocalPath())
-        except:
-            info[ArtifactUtils.ATTR_FILE_PATH_LOCAL] = ""
-        try:
-            info[ArtifactUtils.ATTR_FILE_PATH_LOCAL_ABSOLUTE] = str(file.getLocalAbsPath())
-        except:
-            info[ArtifactUtils.ATTR_FILE_PATH_LOCAL_ABSOLUTE] = ""
-        try:
-            info[ArtifactUtils.ATTR_FILE_PATH_PARENT] = str(file.getParentPath())
-        except:
-            info[ArtifactUtils.ATTR_FILE_PATH_PARENT] = ""
 
-        try:
-            info[ArtifactUtils.ATTR_FILE_NAME] = str(file.getName())
-        except:
-            info[ArtifactUtils.ATTR_FILE_NAME] = ""
-        try:
-            info[ArtifactUtils.ATTR_FILE_EXTENSION] = str(file.getNameExtension())
-        except:
-            info[ArtifactUtils.ATTR_FILE_EXTENSION] = ""
-        try:
-            info[ArtifactUtils.ATTR_FILE_SIZE] = str(file.getSize())
-        except:
-            info[ArtifactUtils.ATTR_FILE_SIZE] = ""
-        try:
-            info[ArtifactUtils.ATTR_FILE_TYPE] = str(file.getType())
-        except:
-            info[ArtifactUtils.ATTR_FILE_TYPE] = ""
-        try:
-            info[ArtifactUtils.ATTR_FILE_TYPE_MIME] = str(file.getMIMEType())
-        except:
-            info[ArtifactUtils.ATTR_FILE_TYPE_MIME] = ""
-        try:
-            info[ArtifactUtils.ATTR_FILE_TYPE_META] = str(file.getMetaTypeAsString())
-        except:
-            info[ArtifactUtils.ATTR_FILE_TYPE_META] = ""
+class TSKFileReader(object):
 
-        try:
-            info[ArtifactUtils.ATTR_HASH_SHA256] = str(file.getSha256Hash())
-        except:
-            info[ArtifactUtils.ATTR_HASH_SHA256] = ""
-        try:
-            info[ArtifactUtils.ATTR_HASH_SHA1] = str(file.getSha1Hash())
-        except:
-            info[ArtifactUtils.ATTR_HASH_SHA1] = ""
-        try:
-            info[ArtifactUtils.ATTR_HASH_MD5] = str(file.getMd5Hash())
-        except:
-            info[ArtifactUtils.ATTR_HASH_MD5] = ""
+    CHUNK_SIZE = 64 * 1024
 
-        try:
-            info[ArtifactUtils.ATTR_EXISTS] = str(file.exists())
-        except:
-            info[ArtifactUtils.ATTR_EXISTS] = ""
-        try:
-            info[ArtifactUtils.ATTR_IS_FILE] = str(file.isFile())
-        except:
-            info[ArtifactUtils.ATTR_IS_FILE] = ""
-        try:
-            info[ArtifactUtils.ATTR_IS_DIR] = str(file.isDir())
-        except:
-            info[ArtifactUtils.ATTR_IS_DIR] = ""
-        try:
-            info[ArtifactUtils.ATTR_IS_ROOT] = str(file.isRoot())
-        except:
-            info[ArtifactUtils.ATTR_IS_ROOT] = ""
-        try:
-            info[ArtifactUtils.ATTR_IS_VIRTUAL] = str(file.isVirtual())
-        except:
-            info[ArtifactUtils.ATTR_IS_VIRTUAL] = ""
-        try:
-            info[ArtifactUtils.ATTR_HAS_FILESYSTEM] = str(file.hasFileSystem())
-        except:
-            info[ArtifactUtils.ATTR_HAS_FILESYSTEM] = ""
-        
-        try:
-            info[ArtifactUtils.ATTR_TIME_A] = str(file.getAtime())
-        except:
-            info[ArtifactUtils.ATTR_TIME_A] = ""
-        try:
-            info[ArtifactUtils.ATTR_TIME_M] = str(file.getMtime())
-        except:
-            info[ArtifactUtils.ATTR_TIME_M] = ""
-        try:
-            info[ArtifactUtils.ATTR_TIME_CR] = str(file.getCrtime())
-        except:
-            info[ArtifactUtils.ATTR_TIME_CR] = ""
-        try:
-            info[ArtifactUtils.ATTR_TIME_C] = str(file.getCtime())
-        except:
-            info[ArtifactUtils.ATTR_TIME_C] = ""
+    def __init__(self, file, chunk_size=CHUNK_SIZE):
+        self.file = file
+        self.size = file.getSize()
+        self.chunk_size = chunk_size
+        self.closed = False
 
-        try:
-            info[ArtifactUtils.ATTR_DATE_A] = str(file.getAtimeAsDate())
-        except:
-            info[ArtifactUtils.ATTR_DATE_A] = ""
-        try:
-            info[ArtifactUtils.ATTR_DATE_M] = str(file.getMtimeAsDate())
-        except:
-            info[ArtifactUtils.ATTR_DATE_M] = ""
-        try:
-            info[ArtifactUtils.ATTR_DATE_CR] = str(file.getCrtimeAsDate())
-        except:
-            info[ArtifactUtils.ATTR_DATE_CR] = ""
-        try:
-            info[ArtifactUtils.ATTR_DATE_C] = str(file.getCtimeAsDate())
-        except:
-            info[ArtifactUtils.ATTR_DATE_C] = ""
+        self._pos = 0
+        self._buffer = ""
+        self._buffer_offset = 0
 
-        return info
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __iter__(self):
+        return self
+
+    def next(self):
+        line = self.readline()
+        if not line:
+            raise StopIteration
+        return line
+
+    __next__ = next
+
+    def close(self):
+        self.closed = True
+        self._buffer = ""
+
+    def tell(self):
+        return self._pos
+
+    def seek(self, offset, whence=0):
+        if whence == 1:
+            offset += self._pos
+        elif whence == 2:
+            offset += self.size
+        self._pos = max(0, offset)
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            size = self.size - self._pos
+
+        parts = []
+        while size > 0 and self._pos < self.size:
+            if not self.__is_buffered() and size >= self.chunk_size:
+                # read large remainders directly, bypassing the buffer
+                part = self.__read_at(self._pos, size)
+            else:
+                start = self.__buffer_start()
+                part = self._buffer[start:start + size]
+            if not part:
+                break
+            parts.append(part)
+            self._pos += len(part)
+            size -= len(part)
+
+        return "".join(parts)
+
+    def readline(self, size=-1):
+        parts = []
+        while self._pos < self.size and size != 0:
+            start = self.__buffer_start()
+            end = self._buffer.find("\n", start)
+            end = len(self._buffer) if end == -1 else end + 1
+            if size > 0:
+                end = min(end, start + size)
+                size -= end - start
+            part = self._buffer[start:end]
+            if not part:
+                break
+            parts.append(part)
+            self._pos += len(part)
+            if part.endswith("\n"):
+                break
+
+        return "".join(parts)
+
+    def readlines(self):
+        return list(self)
+
+    def __is_buffered(self):
+        return self._buffer_offset <= self._pos < self._buffer_offset + len(self._buffer)
+
+    def __buffer_start(self):
+        # make sure the current position is buffered, and return its index in the buffer
+        if not self.__is_buffered():
+            self._buffer = self.__read_at(self._pos, self.chunk_size)
+            self._buffer_offset = self._pos
+        return self._pos - self._buffer_offset
+
+    def __read_at(self, offset, length):
+        length = min(length, self.size - offset)
+        if length <= 0:
+            return ""
+        buffer = jarray.zeros(length, "b")
+        count = self.file.read(buffer, offset, length)
+        return buffer.tostring()[:max(count, 0)]
@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+
+import struct
+from collections import OrderedDict
+
+
+class BinaryVDFReader(object):
+
+    # type bytes of binary VDF
+    TYPE_MAP = "\x00"
+    TYPE_STRING = "\x01"
+    TYPE_INT32 = "\x02"
+    TYPE_FLOAT32 = "\x03"
+    TYPE_POINTER = "\x04"
+    TYPE_WIDESTRING = "\x05"
+    TYPE_COLOR = "\x06"
+    TYPE_UINT64 = "\x07"
+    TYPE_END = "\x08"
+    TYPE_INT64 = "\x0a"
+    TYPE_END_ALT = "\x0b"
+
+    # (format, size) of fixed-size values
+    VALUES = {
+        TYPE_INT32: ("<i", 4),
+        TYPE_POINTER: ("<i", 4),
+        TYPE_COLOR: ("<i", 4),
+        TYPE_FLOAT32: ("<f", 4),
+        TYPE_UINT64: ("<Q", 8),
+        TYPE_INT64: ("<q", 8),
+    }
+
+    @staticmethod
+    def loads(data, pos=0, key_table=None, mapper=OrderedDict):
+        # return the document starting at `pos` and the position after its end marker;
+        # with a key table (appinfo.vdf v29), keys are given as int32 indices into the table
+        values = BinaryVDFReader.VALUES
+        read_string = BinaryVDFReader.__read_string
+        unpack_from = struct.unpack_from
+
+        stack = [mapper()]
+        while True:
+            t = data[pos:pos + 1]
+            if not t:
+                # like vdf, accept a document without end marker
+                if len(stack) > 1:
+                    raise SyntaxError("Reached EOF, but Binary VDF is incomplete")
+                return stack[0], pos
+            pos += 1
+
+            if t == BinaryVDFReader.TYPE_END or t == BinaryVDFReader.TYPE_END_ALT:
+                if len(stack) > 1:
+                    stack.pop()
+                    continue
+                return stack[0], pos
+
+            if key_table is None:
+                key, pos = read_string(data, pos)
+            else:
+                key = key_table[unpack_from("<i", data, pos)[0]]
+                pos += 4
+
+            if t == BinaryVDFReader.TYPE_MAP:
+                # repeated keys merge their subtrees
+                child = stack[-1].get(key)
+                if not isinstance(child, dict):
+                    child = stack[-1][key] = mapper()
+                stack.append(child)
+            elif t == BinaryVDFReader.TYPE_STRING:
+                stack[-1][key], pos = read_string(data, pos)
+            elif t == BinaryVDFReader.TYPE_WIDESTRING:
+                end = pos
+                while True:
+                    end = data.index("\x00\x00", end)
+                    if (end - pos) % 2 == 0:
+                        break
+                    end += 1
+                stack[-1][key] = data[pos:end].decode("utf-16-le")
+                pos = end + 2
+            elif t in values:
+                fmt, size = values[t]
+                stack[-1][key] = unpack_from(fmt, data, pos)[0]
+                pos += size
+            else:
+                raise SyntaxError("Unknown data type at offset {}: {!r}".format(pos - 1, t))
+
+    @staticmethod
+    def skip(data, pos=0, key_table=None):
+        # return the position after the end marker of the document starting at `pos`,
+        # without decoding its keys and values
+        values = BinaryVDFReader.VALUES
+        depth = 1
+        while True:
+            t = data[pos:pos + 1]
+            if not t:
+                if depth > 1:
+                    raise SyntaxError("Reached EOF, but Binary VDF is incomplete")
+                return pos
+            pos += 1
+
+            if t == BinaryVDFReader.TYPE_END or t == BinaryVDFReader.TYPE_END_ALT:
+                depth -= 1
+                if depth == 0:
+                    return pos
+                continue
+
+            pos = data.index("\x00", pos) + 1 if key_table is None else pos + 4
+
+            if t == BinaryVDFReader.TYPE_MAP:
+                depth += 1
+            elif t == BinaryVDFReader.TYPE_STRING:
+                pos = data.index("\x00", pos) + 1
+            elif t == BinaryVDFReader.TYPE_WIDESTRING:
+                end = pos
+                while True:
+                    end = data.index("\x00\x00", end)
+                    if (end - pos) % 2 == 0:
+                        break
+                    end += 1
+                pos = end + 2
+            elif t in values:
+                pos += values[t][1]
+            else:
+                raise SyntaxError("Unknown data type at offset {}: {!r}".format(pos - 1, t))
+
+    @staticmethod
+    def __read_string(data, pos):
+        # same strings as vdf's `binary_loads`: ASCII as is, anything else as unicode
+        end = data.index("\x00", pos)
+        s = data[pos:end]
+        try:
+            s.decode("ascii")
+        except UnicodeDecodeError:
+            s = s.decode("utf-8", "replace")
+        return s, end + 1
+
+
+class AppInfoReader(object):
+
+    # e.g., /deck/.local/share/Steam/appcache/appinfo.vdf
+    MAGIC_V27 = 0x07564427
+    MAGIC_V28 = 0x07564428
+    MAGIC_V29 = 0x07564429
+
+    # info state, last updated, PICS token, SHA-1 of text VDF, change number (and SHA-1 of binary VDF)
+    RECORD_HEADER = struct.Struct("<IIQ20sI")
+    RECORD_HEADER_SHA1 = struct.Struct("<IIQ20sI20s")
+
+    def __init__(self, fh):
+        # index top-level records by app ID, and decode records only on demand
+        self.fh = fh
+        self.index = OrderedDict()
+        self.key_table = None
+
+        magic, self.universe = struct.unpack("<II", self.__read(8))
+        if magic not in [self.MAGIC_V27, self.MAGIC_V28, self.MAGIC_V29]:
+            raise SyntaxError("Unknown appinfo.vdf magic: 0x{:08x}".format(magic))
+        self.version = magic & 0xff
+        self.record_header = self.RECORD_HEADER_SHA1 if self.version >= 0x28 else self.RECORD_HEADER
+
+        key_table_offset = None
+        if self.version >= 0x29:
+            key_table_offset = struct.unpack("<q", self.__read(8))[0]
+
+        while True:
+            app_id = struct.unpack("<I", self.__read(4))[0]
+            if app_id == 0:
+                break
+            size = struct.unpack("<I", self.__read(4))[0]
+            self.index[app_id] = (self.fh.tell(), size)
+            self.fh.seek(size, 1)
+
+        if key_table_offset is not None:
+            self.key_table = self.__read_key_table(key_table_offset)
+
+    def __contains__(self, app_id):
+        return int(app_id) in self.index
+
+    def __len__(self):
+        return len(self.index)
+
+    def app_ids(self):
+        return list(self.index.keys())
+
+    def get(self, app_id):
+        # return the decoded record of an app, or None if it is not indexed
+        app_id = int(app_id)
+        if app_id not in self.index:
+            return None
+
+        offset, size = self.index[app_id]
+        self.fh.seek(offset)
+        data = self.__read(size)
+
+        header = self.record_header.unpack_from(data, 0)
+        vdf_data, _ = BinaryVDFReader.loads(data, self.record_header.size, key_table=self.key_table)
+        return {
+            "app_id": app_id,
+            "info_state": header[0],
+            "last_updated": header[1],
+            "pics_token": header[2],
+            "sha1": header[3].encode("hex"),
+            "change_number": header[4],
+            "data": vdf_data,
+        }
+
+    def get_common(self, app_id):
+        # return the `common` section of an app (with, e.g., name and type), or an empty dictionary
+        record = self.get(app_id)
+        if not record:
+            return {}
+        return record["data"].get("appinfo", {}).get("common", {})
+
+    def __read_key_table(self, offset):
+        self.fh.seek(offset)
+        count = struct.unpack("<I", self.__read(4))[0]
+        content = self.fh.read()
+        keys = []
+        pos = 0
+        for _ in range(count):
+            end = content.index("\x00", pos)
+            keys.append(content[pos:end])
+            pos = end + 1
+        return keys
+
+    def __read(self, size):
+        data = self.fh.read(size)
+        if len(data) != size:
+            raise SyntaxError("Unexpected end of appinfo.vdf at offset {}".format(self.fh.tell()))
+        return data
@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+
+import re
+from collections import OrderedDict
+
+from utils.thirdparty.vdfutils.vdfutils import VDFConsistencyError
+from utils.thirdparty.vdfutils.vdfutils import parse_vdf as vdfutils_parse_vdf
+
+
+class VDFReader(object):
+
+    # tokens of text VDF, as tokenized by vdfutils: whitespace is only space, tab, and newline;
+    # quoted strings end at the first quote not escaped by a backslash (if escaping is enabled);
+    # comments start with a single slash outside of strings
+    PATTERN_TOKEN = re.compile(
+        r'[ \t\n]*(?:"([^"\\]*(?:\\.[^"\\]*)*)"|([{}])|(/)[^\n]*|([^ \t\n"{}]+)|(\Z))', re.S)
+    PATTERN_TOKEN_RAW = re.compile(
+        r'[ \t\n]*(?:"([^"]*)"|([{}])|(/)[^\n]*|([^ \t\n"{}]+)|(\Z))', re.S)
+
+    # anything up to the next brace (or a backslash, quote without end, or the end of the text)
+    PATTERN_SKIP = re.compile(
+        r'(?:[ \t\n]+|"[^"\\]*(?:\\.[^"\\]*)*"|/[^\n]*|[^ \t\n"{}\\/]+)*', re.S)
+    PATTERN_SKIP_RAW = re.compile(
+        r'(?:[ \t\n]+|"[^"]*"|/[^\n]*|[^ \t\n"{}/]+)*', re.S)
+
+    PATTERN_ESCAPE = re.compile(r'\\([\\nt"])')
+    ESCAPES = {"\\": "\\", "n": "\n", "t": "\t", '"': '"'}
+
+    # formats told apart by the first bytes of a document
+    FORMAT_TEXT = "text"
+    FORMAT_TEXT_CR = "text (CR)"
+    FORMAT_BINARY = "binary"
+
+    BOM_UTF8 = "\xef\xbb\xbf"
+    BOMS_UTF16 = ("\xff\xfe", "\xfe\xff")
+
+    # number of bytes inspected for NUL bytes of binary VDF
+    SNIFF_SIZE = 4096
+
+    @staticmethod
+    def sniff(content):
+        # return format and content without byte order mark
+        if content.startswith(VDFReader.BOM_UTF8):
+            content = content[len(VDFReader.BOM_UTF8):]
+        elif content.startswith(VDFReader.BOMS_UTF16):
+            content = content.decode("utf-16").encode("utf-8")
+
+        if "\x00" in content[:VDFReader.SNIFF_SIZE]:
+            return VDFReader.FORMAT_BINARY, content
+        if "\r" in content:
+            # carriage returns are no whitespace for vdfutils (and thus VDFReader)
+            return VDFReader.FORMAT_TEXT_CR, content
+        return VDFReader.FORMAT_TEXT, content
+
+    @staticmethod
+    def parse(text, allow_repeats=False, escape=True):
+        # drop-in for vdfutils' `parse_vdf`, i.e., same results and errors
+        try:
+            return VDFReader.__parse(text, allow_repeats, escape)
+        except _UnsupportedToken:
+            # unquoted tokens with comments or escaped quotes are left to vdfutils
+            return vdfutils_parse_vdf(text, allowRepeats=allow_repeats, escape=escape)
+
+    @staticmethod
+    def extract(text, paths, allow_repeats=False, escape=True):
+        # parse only the subtrees at the given key paths (and the dictionaries leading to them),
+        # and skip other subtrees by matching braces; skipped subtrees are not checked for keys
+        # without values or brackets without headings
+        paths = set(tuple(path) for path in paths)
+        try:
+            return VDFReader.__parse(text, allow_repeats, escape, paths)
+        except _UnsupportedToken:
+            return VDFReader.select(
+                vdfutils_parse_vdf(text, allowRepeats=allow_repeats, escape=escape), paths)
+
+    @staticmethod
+    def select(data, paths, path=()):
+        # reduce a parsed document to the subtrees at the given key paths
+        paths = set(tuple(p) for p in paths)
+        selected = OrderedDict()
+        for key, value in data.items():
+            child_path = path + (key,)
+            if child_path in paths:
+                selected[key] = value
+            elif any(p[:len(child_path)] == child_path for p in paths):
+                if isinstance(value, dict):
+                    selected[key] = VDFReader.select(value, paths, child_path)
+                elif isinstance(value, list):
+                    # repeated keys, of which only subtrees lead to key paths
+                    values = [VDFReader.select(v, paths, child_path) for v in value if isinstance(v, dict)]
+                    if values:
+                        selected[key] = values if len(values) > 1 else values[0]
+        return selected
+
+    @staticmethod
+    def unescape(s):
+        # replace escape sequences only in strings that contain any
+        if "\\" not in s:
+            return s
+        return VDFReader.PATTERN_ESCAPE.sub(lambda m: VDFReader.ESCAPES[m.group(1)], s)
+
+    @staticmethod
+    def __parse(text, allow_repeats, escape, paths=None):
+        match = (VDFReader.PATTERN_TOKEN if escape else VDFReader.PATTERN_TOKEN_RAW).match
+        skip = (VDFReader.PATTERN_SKIP if escape else VDFReader.PATTERN_SKIP_RAW).match
+        unescape = VDFReader.unescape if escape else lambda s: s
+
+        # key path of the current dictionary, and whether all of its keys are kept
+        prefixes = set(p[:i] for p in paths for i in range(1, len(p))) if paths is not None else None
+        path = ()
+        full = paths is None
+
+        data = OrderedDict()
+        stack = []
+        key = None
+        pos = 0
+        while True:
+            m = match(text, pos)
+            if m is None:
+                # a quote that is never closed
+                raise VDFConsistencyError("Mismatched quotes!")
+            pos = m.end()
+            quoted, brace, comment, unquoted, end = m.groups()
+
+            if quoted is not None or unquoted is not None:
+                if quoted is not None:
+                    value = unescape(quoted)
+                else:
+                    if "/" in unquoted or "\\" in unquoted:
+                        raise _UnsupportedToken()
+                    value = unescape(unquoted)
+
+                if key is None:
+                    key = value
+                else:
+                    if full or path + (key,) in paths:
+                        VDFReader.__set(data, key, value, allow_repeats)
+                    elif path + (key,) in prefixes and (key not in data or not allow_repeats):
+                        # keep the position of the key, in case a subtree follows
+                        data[key] = _SKIPPED
+                    key = None
+
+            elif brace == "{":
+                if key is None:
+                    raise VDFConsistencyError("Brackets without heading!")
+                if not full:
+                    child_path = path + (key,)
+                    if child_path not in paths and child_path not in prefixes:
+                        pos = VDFReader.__skip(text, pos, skip)
+                        key = None
+                        continue
+                stack.append((data, key, path, full))
+                if not full:
+                    path = child_path
+                    full = child_path in paths
+                data = OrderedDict()
+                key = None
+
+            elif brace == "}":
+                if not stack:
+                    raise VDFConsistencyError("Mismatched brackets!")
+                if key is not None:
+                    raise VDFConsistencyError("Key '{}' without value!".format(key))
+                child = data
+                if not full:
+                    VDFReader.__remove_skipped(child)
+                data, key, path, full = stack.pop()
+                VDFReader.__set(data, key, child, allow_repeats)
+                key = None
+
+            elif end is not None:
+                break
+
+        if stack:
+            raise VDFConsistencyError("Mismatched brackets!")
+        if key is not None:
+            raise VDFConsistencyError("Key '{}' without value!".format(key))
+        if not full:
+            VDFReader.__remove_skipped(data)
+        return data
+
+    @staticmethod
+    def __remove_skipped(data):
+        for key in [key for key, value in data.items() if value is _SKIPPED]:
+            del data[key]
+
+    @staticmethod
+    def __skip(text, pos, skip):
+        # return the position after the closing brace of the subtree opened before `pos`
+        depth = 1
+        while True:
+            pos = skip(text, pos).end()
+            c = text[pos:pos + 1]
+            if c == "{":
+                depth += 1
+            elif c == "}":
+                depth -= 1
+                if depth == 0:
+                    return pos + 1
+            elif c == "\\":
+                # backslashes within unquoted tokens
+                raise _UnsupportedToken()
+            elif c == '"':
+                raise VDFConsistencyError("Mismatched quotes!")
+            else:
+                raise VDFConsistencyError("Mismatched brackets!")
+            pos += 1
+
+    @staticmethod
+    def __set(data, key, value, allow_repeats):
+        # repeated keys overwrite values in place, or collect them in a list
+        if not allow_repeats or key not in data or data[key] is _SKIPPED:
+            data[key] = value
+        elif isinstance(data[key], list):
+            data[key].append(value)
+        else:
+            data[key] = [data[key], value]
+
+
+class _UnsupportedToken(Exception):
+    pass
+
+
+# placeholder for values skipped on the way to key paths
+_SKIPPED = object()
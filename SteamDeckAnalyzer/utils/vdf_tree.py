@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+
+from itertools import izip
+from collections import OrderedDict
+
+
+class VDFNode(object):
+
+    # read-only subtree of a VDF document: interned keys and values (i.e., strings, numbers, and
+    # child nodes) are kept in two tuples of the same order, instead of a dictionary per subtree
+    __slots__ = ("_keys", "_values", "_index")
+
+    # nodes with more keys are looked up through a dictionary built on first access
+    INDEX_THRESHOLD = 16
+
+    @staticmethod
+    def from_dict(data):
+        # convert a parsed document (dictionaries, and lists of repeated keys) into nodes
+        keys = []
+        values = []
+        for key, value in data.items():
+            keys.append(intern(key) if type(key) is str else key)
+            values.append(VDFNode.__convert(value))
+        return VDFNode(tuple(keys), tuple(values))
+
+    @staticmethod
+    def __convert(value):
+        if isinstance(value, dict):
+            return VDFNode.from_dict(value)
+        if isinstance(value, list):
+            return tuple(VDFNode.__convert(v) for v in value)
+        return value
+
+    def __init__(self, keys=(), values=()):
+        self._keys = keys
+        self._values = values
+        self._index = None
+
+    def __find(self, key):
+        # return the position of the key, or -1
+        if len(self._keys) > self.INDEX_THRESHOLD:
+            if self._index is None:
+                self._index = dict((k, i) for i, k in reversed(list(enumerate(self._keys))))
+            return self._index.get(key, -1)
+        try:
+            return self._keys.index(key)
+        except ValueError:
+            return -1
+
+    def __getitem__(self, key):
+        i = self.__find(key)
+        if i < 0:
+            raise KeyError(key)
+        return self._values[i]
+
+    def __contains__(self, key):
+        return self.__find(key) >= 0
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __eq__(self, other):
+        if isinstance(other, VDFNode):
+            return self._keys == other._keys and self._values == other._values
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    __hash__ = None
+
+    def __repr__(self):
+        return "VDFNode({!r})".format(list(self.items()))
+
+    def get(self, key, default=None):
+        i = self.__find(key)
+        return self._values[i] if i >= 0 else default
+
+    def keys(self):
+        return list(self._keys)
+
+    def values(self):
+        return list(self._values)
+
+    def items(self):
+        return list(zip(self._keys, self._values))
+
+    def iterkeys(self):
+        return iter(self._keys)
+
+    def itervalues(self):
+        return iter(self._values)
+
+    def iteritems(self):
+        return izip(self._keys, self._values)
+
+    def to_dict(self, mapper=OrderedDict):
+        # convert back into (mutable) dictionaries
+        def convert(value):
+            if isinstance(value, VDFNode):
+                return value.to_dict(mapper)
+            if isinstance(value, tuple):
+                return [convert(v) for v in value]
+            return value
+        return mapper((k, convert(v)) for k, v in zip(self._keys, self._values))
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import zlib
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "SteamDeckAnalyzer"))
+from utils.apps import AppUtils
+
+
+class TestAppUtils(unittest.TestCase):
+
+    ATTRIBUTES = ["APP_ID", "NAME", "APP_TYPE", "LASTPLAYED", "PLAYTIME"]
+
+    def test_shortcut_app_id(self):
+        self.assertEqual(AppUtils.get_shortcut_app_id('"/bin/emu"', "Emu"),
+                         str(zlib.crc32('"/bin/emu"Emu') & 0xffffffff | 0x80000000))
+        # non-ASCII strings are read as unicode, but hashed as UTF-8
+        self.assertEqual(AppUtils.get_shortcut_app_id(u'"/bin/\xe4"', u"Sp\xfcl"),
+                         AppUtils.get_shortcut_app_id('"/bin/\xc3\xa4"', "Sp\xc3\xbcl"))
+
+    def test_merge_shortcut_in_both_sources(self):
+        app_id = AppUtils.get_shortcut_app_id('"/bin/emu"', "Emu")
+        sources = {
+            "/deck/.local/share/Steam/userdata/1/config/shortcuts.vdf": {app_id: {
+                "APP_ID": app_id, "NAME": "Emu", "APP_TYPE": "Non-Steam Shortcut", "LASTPLAYED": "1690000000",
+            }},
+            "/deck/.local/share/Steam/userdata/1/config/localconfig.vdf": {app_id: {
+                "LASTPLAYED": "1690000500", "PLAYTIME": "42", "NAME": "",
+            }},
+        }
+        logged = []
+        apps = AppUtils.merge_sources(sources, self.ATTRIBUTES, log=logged.append)
+
+        # localconfig.vdf is read first, so its last-played time is kept, and the other one logged
+        self.assertEqual(list(apps.keys()), [app_id])
+        self.assertEqual(apps[app_id], {
+            "APP_ID": app_id, "NAME": "Emu", "APP_TYPE": "Non-Steam Shortcut",
+            "LASTPLAYED": "1690000500", "PLAYTIME": "42",
+        })
+        self.assertEqual(len(logged), 1)
+        self.assertIn("LASTPLAYED", logged[0])
+
+    def test_merge_without_conflicts(self):
+        sources = {
+            "a.acf": {"730": {"APP_ID": "730", "NAME": "CS"}},
+            "b.vdf": {"730": {"APP_ID": "730", "NAME": "CS", "EXTRA": "x"}, "20": {"APP_ID": "20"}},
+        }
+        logged = []
+        apps = AppUtils.merge_sources(sources, self.ATTRIBUTES, log=logged.append)
+        self.assertEqual(sorted(apps.keys()), ["20", "730"])
+        self.assertEqual(apps["730"]["EXTRA"], "x")
+        self.assertEqual(apps["20"]["NAME"], "")
+        self.assertEqual(logged, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
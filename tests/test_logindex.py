@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "SteamDeckAnalyzer"))
+from utils.logindex import LogEntryIndex
+
+
+class TestLogEntryIndex(unittest.TestCase):
+
+    PATH_CONTENT = "/img/deck/.local/share/Steam/logs/content_log.txt"
+    PATH_CONNECTION = "/img/deck/.local/share/Steam/logs/connection_log.txt"
+
+    ENTRIES = [
+        # (timestamp, path, entry number, message)
+        ("2023-01-01 20:59:59", PATH_CONTENT, 0, u"AppID 730 update started"),
+        ("2023-01-01 21:00:00", PATH_CONNECTION, 0, u"Connection to 155.133.248.38:27018 established"),
+        ("2023-01-01 21:05:00", PATH_CONTENT, 1, u"AppID 730 update finished"),
+        ("2023-01-01 21:15:59", PATH_CONNECTION, 1, u"Connection to 155.133.248.38:27018 closed"),
+        ("2023-01-01 21:16:00", PATH_CONTENT, 2, u"AppID 1091500 update started"),
+        (None, PATH_CONTENT, 3, u"continued without timestamp"),
+    ]
+
+    def setUp(self):
+        # write a small index like the Log Entries module does, with posting lists in two segments
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "log_entries.db")
+        db = sqlite3.connect(self.path)
+        for sql in LogEntryIndex.SCHEMA:
+            db.execute(sql)
+        sources = {}
+        postings = [{}, {}]
+        for i, (ts, path, entry_no, msg) in enumerate(self.ENTRIES):
+            if path not in sources:
+                sources[path] = db.execute("INSERT INTO sources (obj_id, path) VALUES (?, ?)",
+                                           (100 + len(sources), path)).lastrowid
+            entry_id = db.execute("INSERT INTO entries (ts, source_id, entry_no, msg) VALUES (?, ?, ?, ?)",
+                                  (ts, sources[path], entry_no, msg)).lastrowid
+            for token in LogEntryIndex.tokenize(msg):
+                postings[i % 2].setdefault(token, []).append(entry_id)
+        for segment in postings:
+            for token, ids in segment.items():
+                db.execute("INSERT INTO postings (token, first_id, data) VALUES (?, ?, ?)",
+                           (token, ids[0], buffer(LogEntryIndex.encode_postings(ids))))
+        db.commit()
+        db.close()
+        self.index = LogEntryIndex(self.path).open()
+
+    def tearDown(self):
+        self.index.close()
+        shutil.rmtree(self.directory)
+
+    def test_query_time_window(self):
+        entries = self.index.query("2023-01-01 21:00", "2023-01-01 21:15")
+        self.assertEqual(entries, self.ENTRIES[1:4])
+
+    def test_query_paths_and_limit(self):
+        entries = self.index.query(paths=[self.PATH_CONTENT])
+        self.assertEqual(entries, [self.ENTRIES[0], self.ENTRIES[2], self.ENTRIES[4]])
+        self.assertEqual(self.index.query(limit=2), self.ENTRIES[:2])
+
+    def test_search(self):
+        # all tokens must match, across posting list segments
+        self.assertEqual(self.index.get_entries(self.index.search("730 update")),
+                         [self.ENTRIES[0], self.ENTRIES[2]])
+        self.assertEqual(self.index.get_entries(self.index.search("155.133.248.38 closed")),
+                         [self.ENTRIES[3]])
+        self.assertEqual(self.index.search("730 closed"), [])
+        self.assertEqual(self.index.search("unknown"), [])
+
+    def test_missing_index(self):
+        self.assertRaises(IOError, LogEntryIndex(os.path.join(self.directory, "missing.db")).open)
+
+
+if __name__ == "__main__":
+    unittest.main()